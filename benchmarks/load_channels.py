@@ -0,0 +1,80 @@
+"""Benchmark for parsing the channels payload.
+
+Compares decoding the complete response with response.json() against
+streaming it through iter_json_array, on a generated lineup. Peak memory
+excludes the raw response body, which the streaming path never holds.
+"""
+import json
+import sys
+import time
+import tracemalloc
+from os import path
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), ".."))
+
+from ziggonext.jsonstream import iter_json_array  # noqa: E402
+
+CHANNEL_COUNT = 1000
+SCHEDULE_COUNT = 20
+CHUNK_SIZE = 64 * 1024
+
+
+def _payload():
+    channels = []
+    for number in range(CHANNEL_COUNT):
+        station = {
+            "serviceId": "NL_%06d" % number,
+            "title": "Channel %d" % number,
+            "images": [
+                {"assetType": "imageStream", "assetTypes": ["imageStream"], "url": "https://example/%d/stream.jpg" % number},
+                {"assetType": "station-logo-small", "assetTypes": ["station-logo-small"], "url": "https://example/%d/logo.png" % number},
+                {"assetType": "station-logo-large", "assetTypes": ["station-logo-large"], "url": "https://example/%d/large.png" % number},
+            ],
+        }
+        schedules = [
+            {"startTime": 1600000000000 + i, "endTime": 1600003600000 + i, "station": station, "entitlements": ["a", "b", "c"]}
+            for i in range(SCHEDULE_COUNT)
+        ]
+        channels.append({"id": str(number), "title": station["title"], "channelNumber": number, "stationSchedules": schedules})
+    return json.dumps({"entryCount": CHANNEL_COUNT, "totalResults": CHANNEL_COUNT, "channels": channels}).encode("utf-8")
+
+
+def _extract(channel):
+    station = channel["stationSchedules"][0]["station"]
+    images = {image["assetType"]: image["url"] for image in station["images"]}
+    return (station["serviceId"], channel["title"], images.get("imageStream"), images.get("station-logo-small"), channel["channelNumber"])
+
+
+def _full(body):
+    return [_extract(channel) for channel in json.loads(body)["channels"]]
+
+
+def _streaming(body):
+    chunks = (body[start:start + CHUNK_SIZE] for start in range(0, len(body), CHUNK_SIZE))
+    return [_extract(channel) for channel in iter_json_array(chunks, "channels")]
+
+
+def _measure(parse, body):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = parse(body)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    started = time.perf_counter()
+    parse(body)
+    return result, min(elapsed, time.perf_counter() - started), peak
+
+
+def main():
+    body = _payload()
+    print("payload: %d channels, %.1f MB" % (CHANNEL_COUNT, len(body) / 1e6))
+    full, full_time, full_peak = _measure(_full, body)
+    streamed, streamed_time, streamed_peak = _measure(_streaming, body)
+    assert full == streamed
+    print("response.json()   %7.1f ms  peak %6.1f MB" % (full_time * 1000, full_peak / 1e6))
+    print("iter_json_array   %7.1f ms  peak %6.1f MB" % (streamed_time * 1000, streamed_peak / 1e6))
+
+
+if __name__ == "__main__":
+    main()
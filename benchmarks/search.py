@@ -0,0 +1,35 @@
+"""Micro-benchmark for ZiggoNextSearchIndex.search.
+
+Indexes 30000 generated titles and reports the mean query time for
+selective and unselective queries.
+"""
+import random
+import sys
+import timeit
+from os import path
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), ".."))
+
+from ziggonext.const import SEARCH_KIND_LISTING  # noqa: E402
+from ziggonext.search import ZiggoNextSearchIndex  # noqa: E402
+
+ENTRY_COUNT = 30000
+WORDS = ["journaal", "nieuws", "weer", "sport", "late", "night", "show", "film", "de", "het", "van", "w12"]
+QUERIES = ["w", "w12", "nieuws", "nieuws w1", "journaal late", "xyz"]
+
+
+def main():
+    random.seed(1)
+    index = ZiggoNextSearchIndex()
+    for i in range(ENTRY_COUNT):
+        words = [random.choice(WORDS) for _ in range(random.randint(1, 4))]
+        index.add(SEARCH_KIND_LISTING, str(i), " ".join(words) + " w%d" % random.randint(0, 20000))
+    number = 200
+    for query in QUERIES:
+        matches = len(index.search(query, limit=ENTRY_COUNT))
+        seconds = min(timeit.repeat(lambda: index.search(query), number=number, repeat=5))
+        print("%-14s %6d matches %.3f ms/query" % (query, matches, seconds / number * 1e3))
+
+
+if __name__ == "__main__":
+    main()
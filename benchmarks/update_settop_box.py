@@ -0,0 +1,47 @@
+"""Micro-benchmark for ZiggoNextBox.update_settop_box.
+
+Runs linear, replay and nDVR status messages through a box with canned
+listing responses and reports the mean cost per message.
+"""
+import io
+import logging
+import sys
+import timeit
+from os import path
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), ".."))
+
+from tests.conftest import BOX_ID, MqttClient, listing, status  # noqa: E402
+from ziggonext.models import ZiggoChannel  # noqa: E402
+from ziggonext.ziggonextbox import ZiggoNextBox  # noqa: E402
+
+CHANNEL_COUNT = 500
+
+
+def main():
+    logger = logging.getLogger("benchmark")
+    logger.setLevel(logging.WARNING)
+    logger.addHandler(logging.StreamHandler(io.StringIO()))
+    box = ZiggoNextBox(BOX_ID, "Benchmark", "1_nl", None, "nl", logger, MqttClient(), "client", lambda url: listing("Journaal"))
+    box.channels = {
+        "NL_%06d" % i: ZiggoChannel("NL_%06d" % i, "Channel %d" % i, None, None, str(i))
+        for i in range(CHANNEL_COUNT)
+    }
+    messages = [
+        status("linear", {"channelId": "NL_000001", "eventId": "event"}),
+        status("replay", {"eventId": "event"}),
+        status("nDVR", {"recordingId": "recording"}),
+    ]
+    number = 20000
+    for message in messages:
+        sourceType = message["status"]["playerState"]["sourceType"]
+        seconds = min(timeit.repeat(lambda: box.update_settop_box(message), number=number, repeat=5))
+        print("%-8s %.2f us/message" % (sourceType, seconds / number * 1e6))
+    for level in (logging.INFO, logging.DEBUG):
+        logger.setLevel(level)
+        seconds = min(timeit.repeat(lambda: box.update_settop_box(messages[2]), number=number // 10, repeat=3))
+        print("nDVR @%-5s %.2f us/message" % (logging.getLevelName(level), seconds / (number // 10) * 1e6))
+
+
+if __name__ == "__main__":
+    main()
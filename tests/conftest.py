@@ -0,0 +1,94 @@
+"""Fakes shared by the tests and the benchmarks."""
+import json
+import logging
+
+import pytest
+
+from ziggonext.const import ONLINE_RUNNING
+from ziggonext.models import ZiggoChannel
+from ziggonext.ziggonextbox import ZiggoNextBox
+
+BOX_ID = "3C36E4-EOSSTB-000000000001"
+
+
+class MqttClient:
+    """Stands in for the paho client, keeping the published payloads."""
+
+    def __init__(self):
+        self.published = []
+
+    def publish(self, topic, payload=None, qos=0, retain=False):
+        self.published.append(payload)
+
+    def subscribe(self, topic, qos=0):
+        pass
+
+
+class Message:
+    """Stands in for a paho message."""
+
+    def __init__(self, payload, topic=None):
+        self.topic = topic or "1_nl/" + payload["source"]
+        self.payload = json.dumps(payload).encode("utf-8")
+
+
+class Response:
+    """Stands in for a requests response with a JSON body."""
+
+    def __init__(self, content=None, status_code=200, headers=None):
+        self._content = content
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def json(self):
+        return self._content
+
+
+def listing(title, channelId="NL_000001"):
+    return Response({
+        "stationId": "lgi-nl-prod-master:" + channelId,
+        "startTime": 1600000000000,
+        "endTime": 1600003600000,
+        "program": {"title": title, "images": [{"url": "https://example/image.jpg"}]},
+    })
+
+
+def status(sourceType="linear", source=None, deviceId=BOX_ID):
+    if source is None:
+        source = {"channelId": "NL_000001", "eventId": "event"}
+    return {
+        "source": deviceId,
+        "type": "CPE.uiStatus",
+        "status": {
+            "uiStatus": "mainUI",
+            "playerState": {"sourceType": sourceType, "speed": 1, "relativePosition": 0, "source": source},
+        },
+    }
+
+
+def create_box(http_get, mqttClient=None, logger=None):
+    box = ZiggoNextBox(
+        BOX_ID,
+        "Test",
+        "1_nl",
+        None,
+        "nl",
+        logger or logging.getLogger("test"),
+        mqttClient or MqttClient(),
+        "client",
+        http_get,
+    )
+    box.channels = {
+        "NL_000001": ZiggoChannel("NL_000001", "Channel 1", None, None, "1"),
+        "NL_000002": ZiggoChannel("NL_000002", "Channel 2", None, None, "2"),
+    }
+    return box
+
+
+@pytest.fixture
+def box():
+    """A running box serving listings titled "Listing"."""
+    box = create_box(lambda url, **kwargs: listing("Listing"))
+    box._update_settopbox_state({"source": BOX_ID, "state": ONLINE_RUNNING})
+    yield box
+    box.stop()
@@ -0,0 +1,83 @@
+"""Tests for discovering settop boxes from messages of unknown devices."""
+import logging
+import time
+
+from conftest import BOX_ID, Message, MqttClient, status
+from ziggonext import ziggonext
+from ziggonext.const import PUBLISH_PRIORITY_STATUS
+from ziggonext.models import ZiggoNextSession
+from ziggonext.ziggonext import ZiggoNext
+
+OTHER_ID = "3C36E4-OTHERSTB-000000000002"
+
+
+def _create_client(devices):
+    client = ZiggoNext("username", "password")
+    client.logger = logging.getLogger("test")
+    client.session = ZiggoNextSession("1_nl", None, None)
+    client.mqttClient = MqttClient()
+    client.mqttClientId = "client"
+    client._api_url_settop_boxes = "settopboxes"
+    client.calls = 0
+
+    def do_api_call(url):
+        client.calls += 1
+        return devices
+
+    client._do_api_call = do_api_call
+    return client
+
+
+def _receive(client, payload):
+    client._on_mqtt_client_message(None, None, Message(payload))
+    deadline = time.monotonic() + 5
+    while client._discovery_running and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_status_from_unregistered_device_is_ignored(monkeypatch):
+    monkeypatch.setattr(ziggonext, "DISCOVERY_MIN_INTERVAL", 0)
+    client = _create_client([{"deviceId": OTHER_ID, "platformType": "OTHER", "settings": {"deviceFriendlyName": "Other"}}])
+    _receive(client, status(deviceId=OTHER_ID))
+    _receive(client, status(deviceId=OTHER_ID))
+    assert client.calls == 1
+    assert OTHER_ID in client._ignored_devices
+    assert client.settop_boxes == {}
+
+
+def test_box_discovered_from_status_is_initialised(monkeypatch):
+    monkeypatch.setattr(ziggonext, "DISCOVERY_MIN_INTERVAL", 0)
+    client = _create_client([{"deviceId": BOX_ID, "platformType": "EOS", "settings": {"deviceFriendlyName": "Box"}}])
+    _receive(client, status())
+    assert BOX_ID in client.settop_boxes
+    assert client.is_available(BOX_ID)
+    assert client.get_publish_metrics()["queue_depth"][PUBLISH_PRIORITY_STATUS] == 1
+
+
+def test_own_commands_echoed_back_are_ignored(monkeypatch):
+    monkeypatch.setattr(ziggonext, "DISCOVERY_MIN_INTERVAL", 0)
+    client = _create_client([{"deviceId": BOX_ID, "platformType": "EOS", "settings": {"deviceFriendlyName": "Box"}}])
+    _receive(client, status())
+    pushToTV = {
+        "id": "12345678",
+        "type": "CPE.pushToTV",
+        "source": {"clientId": "client", "friendlyDeviceName": "Home Assistant"},
+        "status": {"sourceType": "linear", "source": {"channelId": "NL_000001"}, "relativePosition": 0, "speed": 1},
+    }
+    keyEvent = {"type": "CPE.KeyEvent", "status": {"w3cKey": "MediaPlayPause", "eventType": "keyDownUp"}}
+    client._on_mqtt_client_message(None, None, Message(pushToTV, "1_nl/" + BOX_ID))
+    client._on_mqtt_client_message(None, None, Message(keyEvent, "1_nl/" + BOX_ID))
+    assert client.calls == 1
+
+
+def test_reregistering_drops_removed_boxes():
+    box = {"deviceId": BOX_ID, "platformType": "EOS", "settings": {"deviceFriendlyName": "Box"}}
+    other = {"deviceId": OTHER_ID, "platformType": "HORIZON", "settings": {"deviceFriendlyName": "Other"}}
+    devices = [box, other]
+    client = _create_client(devices)
+    client._register_settop_boxes()
+    assert set(client.snapshot().boxes) == {BOX_ID, OTHER_ID}
+    devices.remove(other)
+    client._register_settop_boxes()
+    assert set(client.snapshot().boxes) == {BOX_ID}
+    assert client.snapshot().boxes[BOX_ID] is client.settop_boxes[BOX_ID].snapshot()
@@ -0,0 +1,70 @@
+"""Tests for ZiggoNextSubscription."""
+import threading
+import time
+
+import pytest
+
+from ziggonext.const import OVERFLOW_BLOCK, OVERFLOW_COALESCE, ONLINE_RUNNING
+from ziggonext.events import ZiggoNextSubscription
+from ziggonext.models import ZiggoNextBoxPlayingInfo, ZiggoNextBoxSnapshot
+from ziggonext.ziggonext import ZiggoNext
+
+
+def _snapshot(box_id, version):
+    return ZiggoNextBoxSnapshot(box_id, box_id, ONLINE_RUNNING, ZiggoNextBoxPlayingInfo(), version)
+
+
+def test_coalesce_keeps_every_event_until_full():
+    subscription = ZiggoNextSubscription(3, OVERFLOW_COALESCE)
+    subscription.put(_snapshot("a", 1))
+    subscription.put(_snapshot("a", 2))
+    subscription.put(_snapshot("b", 1))
+    assert len(subscription) == 3
+    subscription.put(_snapshot("a", 3))
+    assert [(event.box_id, event.version) for event in (subscription.get(0) for _ in range(3))] == [("a", 1), ("b", 1), ("a", 3)]
+    assert subscription.get_metrics() == {"queued": 0, "dropped": 0, "coalesced": 1}
+
+
+def test_coalesce_when_full_replaces_event_of_same_box():
+    subscription = ZiggoNextSubscription(2, OVERFLOW_COALESCE)
+    subscription.put(_snapshot("a", 1))
+    subscription.put(_snapshot("b", 1))
+    subscription.put(_snapshot("b", 2))
+    subscription.put(_snapshot("c", 1))
+    assert [(event.box_id, event.version) for event in (subscription.get(0) for _ in range(2))] == [("b", 2), ("c", 1)]
+    assert subscription.get_metrics() == {"queued": 0, "dropped": 1, "coalesced": 1}
+
+
+def test_block_requires_timeout():
+    with pytest.raises(ValueError):
+        ZiggoNextSubscription(1, OVERFLOW_BLOCK)
+
+
+def test_block_drops_oldest_after_timeout():
+    subscription = ZiggoNextSubscription(1, OVERFLOW_BLOCK, 0.05)
+    subscription.put(_snapshot("a", 1))
+    started = time.monotonic()
+    subscription.put(_snapshot("a", 2))
+    assert time.monotonic() - started >= 0.05
+    assert subscription.get(0).version == 2
+    assert subscription.dropped == 1
+
+
+def test_subscribe_queues_initial_state_before_later_changes(monkeypatch):
+    client = ZiggoNext("username", "password")
+    client._on_box_snapshot(_snapshot("a", 1))
+    updates = []
+    put = ZiggoNextSubscription.put
+
+    def put_with_concurrent_update(subscription, event, wait=True):
+        if not updates:
+            update = threading.Thread(target=client._on_box_snapshot, args=(_snapshot("a", 2),))
+            updates.append(update)
+            update.start()
+            update.join(0.05)
+        put(subscription, event, wait)
+
+    monkeypatch.setattr(ZiggoNextSubscription, "put", put_with_concurrent_update)
+    subscription = client.subscribe()
+    updates[0].join(5)
+    assert [subscription.get(0).version for _ in range(2)] == [1, 2]
@@ -0,0 +1,37 @@
+"""Tests for the source type handlers of ZiggoNextBox."""
+import pytest
+
+from conftest import create_box, status
+from ziggonext.const import BOX_PLAY_STATE_DVR, BOX_PLAY_STATE_REPLAY, BOX_PLAY_STATE_VOD
+from ziggonext.exceptions import ZiggoNextConnectionError
+from ziggonext.models import ZiggoNextBoxPlayingInfo
+
+
+def _unavailable(url, **kwargs):
+    raise ZiggoNextConnectionError("API call rejected, circuit open")
+
+
+@pytest.mark.parametrize("sourceType, source", [
+    (BOX_PLAY_STATE_REPLAY, {"eventId": "event", "channelId": "NL_000001"}),
+    (BOX_PLAY_STATE_DVR, {"recordingId": "recording"}),
+    (BOX_PLAY_STATE_VOD, {"titleId": "title"}),
+])
+def test_handlers_degrade_without_listing(sourceType, source):
+    box = create_box(_unavailable)
+    box.update_settop_box(status(sourceType, source))
+    assert box.info.sourceType == sourceType
+    assert box.info.image is None
+    if sourceType == BOX_PLAY_STATE_REPLAY:
+        assert box.info.channelTitle == "Channel 1"
+
+
+def test_published_info_is_read_only():
+    reused = ZiggoNextBoxPlayingInfo(BOX_PLAY_STATE_VOD, title="First")
+    box = create_box(_unavailable)
+    box.set_source_type_handler(BOX_PLAY_STATE_VOD, lambda statusPayload: reused)
+    box.update_settop_box(status(BOX_PLAY_STATE_VOD, {"titleId": "title"}))
+    snapshot = box.snapshot()
+    reused.setTitle("Second")
+    assert snapshot.info.title == "First"
+    with pytest.raises(AttributeError):
+        snapshot.info.setTitle("Third")
@@ -0,0 +1,76 @@
+"""Tests for iter_json_array."""
+import json
+
+import pytest
+
+from ziggonext.jsonstream import iter_json_array
+
+PAYLOAD = {
+    "totalResults": 3,
+    "entryCount": 3.5,
+    "isComplete": True,
+    "updated": None,
+    "name": "Zenders éè 中文 \U0001F4FA",
+    "channels": [
+        {"title": "NPO 1 é", "channelNumber": 1, "images": [{"url": "https://example/1.png"}]},
+        -12.5e-3,
+        1.5,
+        100,
+        "Rádio \U0001F4FB",
+        True,
+        False,
+        None,
+        [1, [2, 3]],
+        {},
+    ],
+}
+
+
+def _chunks(data: bytes, size: int):
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+def _encode(payload):
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+@pytest.mark.parametrize("size", range(1, 64))
+def test_every_chunk_size(size):
+    data = _encode(PAYLOAD)
+    assert list(iter_json_array(_chunks(data, size), "channels")) == PAYLOAD["channels"]
+
+
+@pytest.mark.parametrize("size", range(1, 16))
+def test_number_split_at_chunk_boundary(size):
+    data = b'{"channels": [1.5, 20, 3e2, -4.25E-1]}'
+    assert list(iter_json_array(_chunks(data, size), "channels")) == [1.5, 20, 300.0, -0.425]
+
+
+def test_key_split_across_chunks():
+    data = _encode({"other": [1], "channels": [1, 2]})
+    split = data.index(b"chan") + 2
+    assert list(iter_json_array([data[:split], data[split:]], "channels")) == [1, 2]
+
+
+def test_first_matching_key_is_used():
+    data = _encode({"channels": ["a"], "nested": {"channels": ["b"]}})
+    assert list(iter_json_array(_chunks(data, 3), "channels")) == ["a"]
+
+
+def test_string_chunks():
+    data = json.dumps(PAYLOAD)
+    assert list(iter_json_array(_chunks(data, 7), "channels")) == PAYLOAD["channels"]
+
+
+def test_empty_array():
+    assert list(iter_json_array([b'{"channels": [ ]}'], "channels")) == []
+
+
+def test_missing_key():
+    assert list(iter_json_array(_chunks(_encode({"other": [1, 2]}), 4), "channels")) == []
+
+
+@pytest.mark.parametrize("data", [b'{"channels": [1, 2', b'{"channels": [1, {"a": ', b'{"channels": [1, 2.'])
+def test_truncated_array(data):
+    with pytest.raises(ValueError):
+        list(iter_json_array(_chunks(data, 3), "channels"))
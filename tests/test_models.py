@@ -0,0 +1,60 @@
+"""Tests for the playback position of ZiggoNextBoxPlayingInfo."""
+import pytest
+
+from ziggonext.const import BOX_PLAY_STATE_CHANNEL, BOX_PLAY_STATE_REPLAY
+from ziggonext.models import ZiggoNextBoxPlayingInfo
+
+START = 1600000000000
+END = 1600003600000
+
+
+def _info(position, speed, timestamp=1000.0, startTime=START, endTime=END):
+    info = ZiggoNextBoxPlayingInfo(BOX_PLAY_STATE_REPLAY, startTime=startTime, endTime=endTime)
+    info.setPlayback(position, speed, timestamp)
+    return info
+
+
+def test_duration():
+    assert _info(0, 1).getDuration() == 3600
+    assert _info(0, 1, endTime=None).getDuration() is None
+
+
+def test_position_extrapolated_from_status():
+    assert _info(60000, 1).getPosition(now=1010.0) == 70
+
+
+def test_paused_position_does_not_move():
+    assert _info(60000, 0).getPosition(now=1500.0) == 60
+
+
+@pytest.mark.parametrize("speed, expected", [(4, 100), (-4, 20)])
+def test_fast_forward_and_rewind(speed, expected):
+    assert _info(60000, speed).getPosition(now=1010.0) == expected
+
+
+def test_position_clamped_to_duration():
+    assert _info(3590000, 1).getPosition(now=1020.0) == 3600
+
+
+def test_position_clamped_to_zero():
+    assert _info(10000, -30).getPosition(now=1010.0) == 0
+
+
+def test_linear_position_from_start_time():
+    info = ZiggoNextBoxPlayingInfo(BOX_PLAY_STATE_CHANNEL, startTime=START, endTime=END)
+    info.setPlayback(None, 1, 1000.0)
+    assert info.getPosition(now=START / 1000 + 600) == 600
+    assert info.getPosition(now=START / 1000 + 7200) == 3600
+    assert info.getPosition(now=START / 1000 - 60) == 0
+
+
+@pytest.mark.parametrize("position, speed, startTime", [
+    (None, 1, None),
+    (None, 0, START),
+])
+def test_unknown_position(position, speed, startTime):
+    assert _info(position, speed, startTime=startTime).getPosition(now=1010.0) is None
+
+
+def test_position_without_status():
+    assert ZiggoNextBoxPlayingInfo().getPosition(now=1010.0) is None
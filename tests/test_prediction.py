@@ -0,0 +1,85 @@
+"""Tests for the optimistic state applied by ZiggoNextBox commands."""
+import time
+
+from conftest import BOX_ID, status
+from ziggonext import ziggonextbox
+from ziggonext.const import ONLINE_STANDBY
+
+
+def _status(channelId):
+    return status(source={"channelId": channelId, "eventId": "event"})
+
+
+def test_stale_status_keeps_prediction(box):
+    box.set_channel("NL_000002")
+    box.update_settop_box(_status("NL_000001"))
+    assert box.info.channelId == "NL_000002"
+    assert box.info.provisional
+    box.update_settop_box(_status("NL_000002"))
+    assert box.info.channelId == "NL_000002"
+    assert not box.info.provisional
+    assert box.get_prediction_metrics() == {"predicted": 1, "confirmed": 1, "rolled_back": 0}
+
+
+def test_unconfirmed_prediction_rolls_back_to_last_status(box, monkeypatch):
+    monkeypatch.setattr(ziggonextbox, "PREDICTION_TIMEOUT", 0.05)
+    box.set_channel("NL_000002")
+    box.update_settop_box(_status("NL_000001"))
+    time.sleep(0.2)
+    assert box.info.channelId == "NL_000001"
+    assert not box.info.provisional
+    assert box.get_prediction_metrics() == {"predicted": 1, "confirmed": 0, "rolled_back": 1}
+
+
+def test_prediction_without_status_rolls_back(box, monkeypatch):
+    monkeypatch.setattr(ziggonextbox, "PREDICTION_TIMEOUT", 0.05)
+    box.update_settop_box(_status("NL_000001"))
+    box.set_channel("NL_000002")
+    time.sleep(0.2)
+    assert box.info.channelId == "NL_000001"
+    assert not box.info.provisional
+
+
+def test_standby_clears_prediction(box):
+    box.set_channel("NL_000002")
+    box._update_settopbox_state({"source": BOX_ID, "state": ONLINE_STANDBY})
+    assert box._prediction is None
+    box.update_settop_box(_status("NL_000001"))
+    assert box.info.channelId == "NL_000001"
+
+
+def test_rollback_does_not_overwrite_newer_status(box, monkeypatch):
+    box.set_channel("NL_000002")
+    prediction = box._prediction
+    prediction.timer.cancel()
+    box.update_settop_box(_status("NL_000001"))
+    update = box._update_settop_box
+
+    def interleaved(payload, generation=None, replaces=None):
+        # the mqtt thread publishes a newer status after the timer took the prediction
+        update(_status("NL_000002"))
+        update(payload, generation, replaces)
+
+    monkeypatch.setattr(box, "_update_settop_box", interleaved)
+    box._expire_prediction(prediction)
+    assert box.info.channelId == "NL_000002"
+    assert not box.info.provisional
+
+
+def test_rollback_does_not_overwrite_standby(box, monkeypatch):
+    box.update_settop_box(_status("NL_000001"))
+    box.set_channel("NL_000002")
+    prediction = box._prediction
+    prediction.timer.cancel()
+    publish = box._publish
+
+    def interleaved(*args, **kwargs):
+        if kwargs.get("replaces") is not None:
+            # standby arrives after the timer took the prediction
+            box._update_settopbox_state({"source": BOX_ID, "state": ONLINE_STANDBY})
+        return publish(*args, **kwargs)
+
+    monkeypatch.setattr(box, "_publish", interleaved)
+    box._expire_prediction(prediction)
+    assert box.state == ONLINE_STANDBY
+    assert box.info.channelId is None
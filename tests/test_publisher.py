@@ -0,0 +1,73 @@
+"""Tests for ZiggoNextPublisher."""
+import logging
+import threading
+import time
+
+from ziggonext.const import PUBLISH_PRIORITY_COMMAND, PUBLISH_PRIORITY_STATUS
+from ziggonext.publisher import ZiggoNextPublisher
+
+
+class _FailingClient:
+    def __init__(self):
+        self.published = []
+        self.done = threading.Event()
+
+    def publish(self, topic, payload=None, qos=0, retain=False):
+        if topic == "bad":
+            raise ValueError("Invalid topic")
+        self.published.append(topic)
+        self.done.set()
+
+
+def test_failed_publish_keeps_worker_running():
+    client = _FailingClient()
+    publisher = ZiggoNextPublisher()
+    publisher.start(client, logging.getLogger("test"))
+    try:
+        publisher.publish("bad", "{}")
+        publisher.publish("good", "{}")
+        assert client.done.wait(5)
+        deadline = time.monotonic() + 5
+        while publisher.get_metrics()["published"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        metrics = publisher.get_metrics()
+        assert client.published == ["good"]
+        assert metrics["running"]
+        assert metrics["failed"] == 1
+        assert metrics["published"] == 1
+    finally:
+        publisher.stop()
+    assert not publisher.get_metrics()["running"]
+
+
+class _Client:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, topic, payload=None, qos=0, retain=False):
+        self.published.append(topic)
+
+
+def test_stop_publishes_queued_commands():
+    client = _Client()
+    publisher = ZiggoNextPublisher(box_rate=20, box_burst=1)
+    publisher.start(client, logging.getLogger("test"))
+    for index in range(3):
+        publisher.publish("command%d" % index, "{}", box_id="box")
+    publisher.publish("status", "{}", PUBLISH_PRIORITY_STATUS, box_id="box")
+    publisher.stop()
+    assert client.published == ["command0", "command1", "command2"]
+    assert publisher.get_metrics()["queue_depth"][PUBLISH_PRIORITY_STATUS] == 1
+
+
+def test_stop_waits_at_most_flush_timeout():
+    client = _Client()
+    publisher = ZiggoNextPublisher(box_rate=0.01, box_burst=1)
+    publisher.start(client, logging.getLogger("test"))
+    for index in range(3):
+        publisher.publish("command%d" % index, "{}", box_id="box")
+    started = time.monotonic()
+    publisher.stop(flush_timeout=0.1)
+    assert time.monotonic() - started < 1
+    assert client.published == ["command0"]
+    assert publisher.get_metrics()["queue_depth"][PUBLISH_PRIORITY_COMMAND] == 2
@@ -0,0 +1,142 @@
+"""Tests for the retry policy, circuit breaker and stale fallback of API calls."""
+import logging
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+
+from conftest import Response
+from ziggonext.exceptions import ZiggoNextConnectionError
+from ziggonext.models import ZiggoNextSession
+from ziggonext.resilience import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    ZiggoNextCircuitBreaker,
+    ZiggoNextRetryPolicy,
+)
+from ziggonext.ziggonext import API_CALL_MAX_TRIES, ZiggoNext
+
+
+class _Requests:
+    """Serves the queued responses, raising the queued exceptions."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.urls = []
+
+    def __call__(self, url, **kwargs):
+        self.urls.append(url)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def client():
+    client = ZiggoNext("username", "password")
+    client.logger = logging.getLogger("test")
+    client.session = ZiggoNextSession("1_nl", "oespToken", None)
+    client.retry_policy = ZiggoNextRetryPolicy(max_attempts=3, base_delay=0)
+    return client
+
+
+def test_breaker_opens_after_threshold():
+    breaker = ZiggoNextCircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_CLOSED
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_OPEN
+    assert not breaker.allow()
+    assert breaker.get_metrics() == {"state": CIRCUIT_OPEN, "failures": 2, "opened": 1, "rejected": 1}
+
+
+def test_breaker_half_open_allows_single_trial():
+    breaker = ZiggoNextCircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    assert breaker.state == CIRCUIT_HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CIRCUIT_CLOSED
+    assert breaker.allow()
+
+
+def test_breaker_failed_trial_reopens():
+    breaker = ZiggoNextCircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_OPEN
+    assert breaker.get_metrics()["opened"] == 2
+
+
+def test_retry_after_seconds():
+    policy = ZiggoNextRetryPolicy(max_delay=10)
+    assert policy.get_delay(1, Response(status_code=429, headers={"Retry-After": "3"})) == 3
+    assert policy.get_delay(1, Response(status_code=429, headers={"Retry-After": "120"})) == 10
+
+
+def test_retry_after_http_date():
+    policy = ZiggoNextRetryPolicy(max_delay=100)
+    delay = policy.get_delay(1, Response(status_code=503, headers={"Retry-After": formatdate(time.time() + 30, usegmt=True)}))
+    assert 28 <= delay <= 30
+    past = formatdate(time.time() - 30, usegmt=True)
+    assert policy.get_delay(1, Response(status_code=503, headers={"Retry-After": past})) == 0
+
+
+def test_retry_after_invalid_uses_backoff():
+    policy = ZiggoNextRetryPolicy(base_delay=1, max_delay=10)
+    delay = policy.get_delay(3, Response(status_code=503, headers={"Retry-After": "soon"}))
+    assert 0 <= delay <= 4
+
+
+def test_stale_response_served_while_failing(client, monkeypatch):
+    url = "https://example/listings/1"
+    fresh = Response({"title": "Journaal"})
+    monkeypatch.setattr(requests, "get", _Requests(fresh, Response(status_code=503), requests.ConnectionError()))
+    assert client._http_get(url) is fresh
+    assert client._http_get(url, retry=False) is fresh
+    assert client._http_get(url, retry=False) is fresh
+
+
+def test_failure_without_stale_response(client, monkeypatch):
+    failing = Response(status_code=503)
+    monkeypatch.setattr(requests, "get", _Requests(failing, failing, failing, requests.ConnectionError()))
+    assert client._http_get("https://example/listings/1") is failing
+    with pytest.raises(ZiggoNextConnectionError):
+        client._http_get("https://example/listings/1", retry=False)
+
+
+def test_token_is_never_served_stale(client, monkeypatch):
+    monkeypatch.setattr(requests, "get", _Requests(Response({"token": "jwt"}), requests.ConnectionError()))
+    assert client._http_get(client._api_url_token).json() == {"token": "jwt"}
+    with pytest.raises(ZiggoNextConnectionError):
+        client._http_get(client._api_url_token, retry=False)
+
+
+def test_api_call_refreshes_session_on_forbidden(client, monkeypatch):
+    responses = [Response(status_code=403), Response(status_code=403), Response({"token": "jwt"})]
+    sessions = []
+    monkeypatch.setattr(client, "_http_get", lambda url, **kwargs: responses.pop(0))
+    monkeypatch.setattr(client, "get_session", lambda: sessions.append(True))
+    assert client._do_api_call(client._api_url_token) == {"token": "jwt"}
+    assert len(sessions) == 2
+
+
+def test_api_call_gives_up_after_max_tries(client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(client, "_http_get", lambda url, **kwargs: calls.append(url) or Response(status_code=403))
+    monkeypatch.setattr(client, "get_session", lambda: None)
+    with pytest.raises(ZiggoNextConnectionError):
+        client._do_api_call(client._api_url_token)
+    assert len(calls) == API_CALL_MAX_TRIES
+
+
+def test_api_call_fails_on_other_status(client, monkeypatch):
+    monkeypatch.setattr(client, "_http_get", lambda url, **kwargs: Response(status_code=404))
+    with pytest.raises(ZiggoNextConnectionError):
+        client._do_api_call(client._api_url_token)
@@ -0,0 +1,26 @@
+"""Tests for ZiggoNextSearchIndex."""
+from ziggonext.const import SEARCH_KIND_CHANNEL, SEARCH_KIND_LISTING
+from ziggonext.search import ZiggoNextSearchIndex
+
+
+def test_max_entries_evicts_least_recently_added():
+    index = ZiggoNextSearchIndex({SEARCH_KIND_LISTING: 2})
+    index.add(SEARCH_KIND_CHANNEL, "c1", "Journaal 24")
+    index.add(SEARCH_KIND_LISTING, "l1", "Journaal")
+    index.add(SEARCH_KIND_LISTING, "l2", "Journaal laat")
+    index.add(SEARCH_KIND_LISTING, "l1", "Journaal")
+    index.add(SEARCH_KIND_LISTING, "l3", "Journaal nacht")
+    assert len(index) == 3
+    assert index.get(SEARCH_KIND_LISTING, "l2") is None
+    assert {result.id for result in index.search("journaal")} == {"c1", "l1", "l3"}
+    assert index.search("laat") == []
+
+
+def test_ranking_prefers_exact_tokens_and_title_prefix():
+    index = ZiggoNextSearchIndex()
+    index.add(SEARCH_KIND_CHANNEL, "c1", "Nieuwsuur")
+    index.add(SEARCH_KIND_CHANNEL, "c2", "Het nieuws")
+    index.add(SEARCH_KIND_CHANNEL, "c3", "Nieuws")
+    index.add(SEARCH_KIND_CHANNEL, "c4", "Nieuws van de week")
+    assert [result.id for result in index.search("nieuws")] == ["c3", "c4", "c1", "c2"]
+    assert [result.id for result in index.search("nieuws", limit=2)] == ["c3", "c4"]
@@ -0,0 +1,108 @@
+"""Tests for status coalescing on ZiggoNextBox."""
+import threading
+
+from conftest import BOX_ID, create_box, listing, status
+from ziggonext.const import ONLINE_RUNNING, ONLINE_STANDBY
+
+
+class _Listings:
+    """Serves listings titled after their event id, optionally blocking until released."""
+
+    def __init__(self):
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, url, **kwargs):
+        self.entered.set()
+        self.release.wait(5)
+        return listing(url.rsplit("/", 1)[-1])
+
+
+def _create_box(listings, settle_window=None):
+    box = create_box(listings)
+    box.set_status_settle_window(settle_window)
+    box._update_settopbox_state({"source": BOX_ID, "state": ONLINE_RUNNING})
+    return box
+
+
+def _status(eventId):
+    return status(source={"channelId": "NL_000001", "eventId": eventId})
+
+
+def test_inline_by_default():
+    box = _create_box(_Listings())
+    box.submit_status(_status("T"))
+    assert box.info.title == "T"
+    assert box._status_worker is None
+    assert box.get_status_metrics() == {"received": 1, "processed": 1, "coalesced": 0}
+
+
+def test_burst_is_coalesced():
+    box = _create_box(_Listings(), settle_window=0.05)
+    try:
+        for index in range(5):
+            box.submit_status(_status("T%d" % index))
+        assert box.wait_for_status(5)
+        assert box.info.title == "T4"
+        assert box.get_status_metrics() == {"received": 5, "processed": 1, "coalesced": 4}
+    finally:
+        box.stop()
+
+
+def test_standby_invalidates_status_in_progress():
+    listings = _Listings()
+    box = _create_box(listings, settle_window=0)
+    try:
+        listings.release.clear()
+        box.submit_status(_status("T"))
+        assert listings.entered.wait(5)
+        box._update_settopbox_state({"source": BOX_ID, "state": ONLINE_STANDBY})
+        listings.release.set()
+        assert box.wait_for_status(5)
+        assert box.state == ONLINE_STANDBY
+        assert box.info.title is None
+    finally:
+        box.stop()
+
+
+def test_standby_drops_pending_status():
+    listings = _Listings()
+    box = _create_box(listings, settle_window=0)
+    try:
+        listings.release.clear()
+        box.submit_status(_status("T1"))
+        assert listings.entered.wait(5)
+        box.submit_status(_status("T2"))
+        box._update_settopbox_state({"source": BOX_ID, "state": ONLINE_STANDBY})
+        listings.release.set()
+        assert box.wait_for_status(5)
+        assert box.info.title is None
+        assert box.get_status_metrics() == {"received": 2, "processed": 1, "coalesced": 1}
+    finally:
+        box.stop()
+
+
+def test_wait_for_status_times_out_while_processing():
+    listings = _Listings()
+    box = _create_box(listings, settle_window=0)
+    try:
+        listings.release.clear()
+        box.submit_status(_status("T"))
+        assert listings.entered.wait(5)
+        assert not box.wait_for_status(0.05)
+        listings.release.set()
+        assert box.wait_for_status(5)
+        assert box.info.title == "T"
+    finally:
+        box.stop()
+
+
+def test_stop_ends_worker():
+    box = _create_box(_Listings(), settle_window=0)
+    box.submit_status(_status("T"))
+    assert box.wait_for_status(5)
+    worker = box._status_worker
+    box.stop()
+    assert not worker.is_alive()
+    assert box.wait_for_status(0)
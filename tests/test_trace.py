@@ -0,0 +1,23 @@
+"""Tests for capturing traces."""
+from ziggonext.trace import ZiggoNextTraceRecorder, ZiggoNextTraceReplayer
+
+
+class _Response:
+    status_code = 200
+
+    def __init__(self, text):
+        self.text = text
+
+
+def test_record_http_redacts_tokens(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    recorder = ZiggoNextTraceRecorder(path)
+    recorder.record_session("1_nl", None, "client")
+    recorder.record_http("https://example/tokens/jwt", _Response('{"token": "secret.jwt", "expiry": 1}'))
+    recorder.record_http("https://example/listings/1", _Response('{"program": {"title": "Journaal"}}'))
+    recorder.close()
+    with open(path) as trace:
+        assert "secret.jwt" not in trace.read()
+    replayer = ZiggoNextTraceReplayer(path)
+    assert replayer.get("https://example/tokens/jwt").json() == {"token": "REDACTED", "expiry": 1}
+    assert replayer.get("https://example/listings/1").json() == {"program": {"title": "Journaal"}}
@@ -0,0 +1,57 @@
+"""Tests for ZiggoNextWatchdog."""
+import json
+import logging
+import threading
+import time
+
+from ziggonext.ziggonext import ZiggoNext
+
+
+class _Message:
+    topic = "1_nl/unknown"
+    payload = json.dumps({"source": None}).encode("utf-8")
+
+
+def test_stall_before_connect_is_reported():
+    client = ZiggoNext("username", "password")
+    stalls = []
+    reported = threading.Event()
+    watchdog = client.enable_watchdog(0.02, lambda stall: (stalls.append(stall), reported.set()))
+    try:
+        with watchdog.measure("handler", "box"):
+            assert reported.wait(5)
+        assert stalls[0].name == "handler"
+        assert stalls[0].stack
+    finally:
+        client.disable_watchdog()
+
+
+def test_mqtt_message_is_measured():
+    client = ZiggoNext("username", "password")
+    client.logger = logging.getLogger("test")
+    client.enable_watchdog()
+    try:
+        client._on_mqtt_client_message(None, None, _Message())
+        assert client.get_watchdog_metrics()["handlers"]["mqtt_message"]["count"] == 1
+    finally:
+        client.disable_watchdog()
+
+
+def test_failing_stall_callback_keeps_monitor_running():
+    client = ZiggoNext("username", "password")
+    calls = []
+
+    def stall_callback(stall):
+        calls.append(stall)
+        raise ValueError("Callback failed")
+
+    watchdog = client.enable_watchdog(0.02, stall_callback)
+    try:
+        with watchdog.measure("first"):
+            time.sleep(0.1)
+        with watchdog.measure("second"):
+            time.sleep(0.1)
+        assert [stall.name for stall in calls] == ["first", "second"]
+        assert watchdog._monitor.is_alive()
+    finally:
+        client.disable_watchdog()
@@ -1,6 +1,10 @@
 """Python client for Ziggo Next."""
 from .ziggonext import ZiggoNext
-from .models import ZiggoRecordingSingle, ZiggoRecordingShow
+from .models import ZiggoRecordingSingle, ZiggoRecordingShow, ZiggoListing
 from .ziggonextbox import ZiggoNextBox
-from .const import ONLINE_RUNNING, ONLINE_STANDBY
+from .search import ZiggoSearchResult
+from .publisher import ZiggoNextPublisher
+from .watchdog import ZiggoNextWatchdog, ZiggoNextStall
+from .events import ZiggoNextSubscription
+from .const import ONLINE_RUNNING, ONLINE_STANDBY, SEARCH_KIND_CHANNEL, SEARCH_KIND_RECORDING, SEARCH_KIND_SHOW, SEARCH_KIND_LISTING, PUBLISH_PRIORITY_COMMAND, PUBLISH_PRIORITY_STATUS, OVERFLOW_DROP_OLDEST, OVERFLOW_COALESCE, OVERFLOW_BLOCK
 from .exceptions import ZiggoNextAuthenticationError, ZiggoNextConnectionError
\ No newline at end of file
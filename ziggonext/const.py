@@ -12,6 +12,21 @@ BOX_PLAY_STATE_BUFFER = "reviewbuffer"
 BOX_PLAY_STATE_APP = "app"
 BOX_PLAY_STATE_VOD = "VOD"
 
+# Outbound message priorities, lower is sent first
+PUBLISH_PRIORITY_COMMAND = 0
+PUBLISH_PRIORITY_STATUS = 1
+
+# Overflow policies of event subscriptions
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_COALESCE = "coalesce"
+OVERFLOW_BLOCK = "block"
+
+# Search result kinds
+SEARCH_KIND_CHANNEL = "channel"
+SEARCH_KIND_RECORDING = "recording"
+SEARCH_KIND_SHOW = "show"
+SEARCH_KIND_LISTING = "listing"
+
 # List with available media keys.
 MEDIA_KEY_POWER = "Power"
 MEDIA_KEY_ENTER = "Enter"
@@ -0,0 +1,144 @@
+"""Subscriptions to settop box state events."""
+import asyncio
+import threading
+import time
+from collections import deque
+
+from .const import OVERFLOW_BLOCK, OVERFLOW_COALESCE, OVERFLOW_DROP_OLDEST
+from .models import ZiggoNextBoxSnapshot
+
+
+class ZiggoNextSubscription:
+    """Bounded queue of box snapshots for one consumer.
+
+    Iterate it (for event in subscription) or async iterate it
+    (async for event in subscription) to receive a ZiggoNextBoxSnapshot for
+    every change. When the queue is full the overflow policy decides:
+    drop_oldest discards the oldest event, coalesce drops the newest queued
+    event of the same box before appending the new one (dropping the oldest
+    event when the box has none queued) and block makes the publisher wait
+    up to block_timeout seconds before dropping the oldest event. The
+    publisher is the mqtt thread or the thread sending a command, so block
+    requires a finite block_timeout.
+    """
+
+    def __init__(self, max_size: int = 100, overflow: str = OVERFLOW_DROP_OLDEST, block_timeout: float = None, on_close=None):
+        if overflow not in (OVERFLOW_DROP_OLDEST, OVERFLOW_COALESCE, OVERFLOW_BLOCK):
+            raise ValueError("Unknown overflow policy: " + str(overflow))
+        if overflow == OVERFLOW_BLOCK and (block_timeout is None or block_timeout < 0):
+            raise ValueError("The block overflow policy requires a finite block_timeout")
+        self.max_size = max_size
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self.coalesced = 0
+        self.closed = False
+        self._events = deque()
+        self._condition = threading.Condition()
+        self._async_waiters = []
+        self._on_close = on_close
+
+    def __len__(self):
+        return len(self._events)
+
+    def put(self, event: ZiggoNextBoxSnapshot, wait: bool = True):
+        """Queues an event, wait=False applies the block policy without waiting"""
+        with self._condition:
+            if self.closed:
+                return
+            if len(self._events) >= self.max_size and self.overflow == OVERFLOW_COALESCE:
+                for index in range(len(self._events) - 1, -1, -1):
+                    if self._events[index].box_id == event.box_id:
+                        del self._events[index]
+                        self.coalesced += 1
+                        break
+            if wait and len(self._events) >= self.max_size and self.overflow == OVERFLOW_BLOCK:
+                deadline = time.monotonic() + self.block_timeout
+                while len(self._events) >= self.max_size and not self.closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if self.closed:
+                    return
+            if len(self._events) >= self.max_size:
+                self._events.popleft()
+                self.dropped += 1
+            self._events.append(event)
+            self._condition.notify_all()
+            waiters = self._async_waiters
+            self._async_waiters = []
+        _wake_all(waiters)
+
+    def get(self, timeout: float = None):
+        """Returns the next event, None on timeout or once the subscription is closed"""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._events or self.closed, timeout):
+                return None
+            if self.closed:
+                return None
+            event = self._events.popleft()
+            self._condition.notify_all()
+            return event
+
+    def close(self):
+        with self._condition:
+            if self.closed:
+                return
+            self.closed = True
+            self._events.clear()
+            self._condition.notify_all()
+            waiters = self._async_waiters
+            self._async_waiters = []
+        _wake_all(waiters)
+        if self._on_close:
+            self._on_close(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        event = self.get()
+        if event is None:
+            raise StopIteration
+        return event
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            with self._condition:
+                if self.closed:
+                    raise StopAsyncIteration
+                if self._events:
+                    event = self._events.popleft()
+                    self._condition.notify_all()
+                    return event
+                future = loop.create_future()
+                self._async_waiters.append((loop, future))
+            await future
+
+    def get_metrics(self):
+        return {"queued": len(self._events), "dropped": self.dropped, "coalesced": self.coalesced}
+
+
+def _wake_all(waiters):
+    for loop, future in waiters:
+        try:
+            loop.call_soon_threadsafe(_wake, future)
+        except RuntimeError:
+            # the consumer's event loop is already closed
+            pass
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
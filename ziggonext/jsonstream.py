@@ -0,0 +1,74 @@
+"""Incremental decoding of large JSON responses."""
+import codecs
+import json
+import re
+
+_WHITESPACE = re.compile(r"[\s,]*")
+_NUMBER_CHARS = "0123456789.eE+-"
+
+
+def iter_json_array(chunks, key: str):
+    """Yields the items of the array stored under key, decoding one item at a time.
+
+    chunks is an iterable of bytes, for example response.iter_content(). Only
+    the current item and the undecoded part of the stream are kept in memory.
+    The first occurrence of key followed by an array is used, which is the
+    top level key for payloads that list their scalar fields first.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    start_pattern = re.compile(r'"' + re.escape(key) + r'"\s*:\s*\[')
+    chunks = iter(chunks)
+    buffer = ""
+    position = 0
+    exhausted = False
+
+    def read():
+        nonlocal buffer, position, exhausted
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            exhausted = True
+            buffer = buffer[position:] + text_decoder.decode(b"", final=True)
+            position = 0
+            return
+        if isinstance(chunk, bytes):
+            chunk = text_decoder.decode(chunk)
+        buffer = buffer[position:] + chunk
+        position = 0
+
+    while True:
+        match = start_pattern.search(buffer, position)
+        if match is not None:
+            position = match.end()
+            break
+        if exhausted:
+            return
+        # keep enough of the tail to match a key split over two chunks
+        position = max(position, len(buffer) - len(key) - 64)
+        read()
+
+    while True:
+        position = _WHITESPACE.match(buffer, position).end()
+        if position == len(buffer):
+            if exhausted:
+                raise ValueError("Unterminated array: " + key)
+            read()
+            continue
+        if buffer[position] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if exhausted:
+                raise
+            read()
+            continue
+        if not exhausted and isinstance(item, (int, float)) and not isinstance(item, bool) and (
+            end == len(buffer) or buffer[end] in _NUMBER_CHARS
+        ):
+            # a number may continue in the next chunk, "1." decodes as 1
+            read()
+            continue
+        position = end
+        yield item
@@ -1,4 +1,8 @@
 """Python client for Ziggo Next."""
+import time
+from types import MappingProxyType
+from typing import Mapping, NamedTuple
+
 class ZiggoNextSession:
     householdId: str
     oespToken: str
@@ -15,14 +19,32 @@ class ZiggoNextBoxPlayingInfo:
     image: str
     sourceType: str
     paused: bool
-
-    def __init__(self):
-        self.channelId = None
-        self.title = None
-        self.image = None
-        self.sourceType = None
-        self.paused = False
-        self.channelTitle = None
+    position: int
+    speed: float
+    positionTimestamp: float
+    startTime: int
+    endTime: int
+    provisional: bool
+
+    def __init__(self, sourceType=None, channelId=None, channelTitle=None, title=None, image=None, paused=False, startTime=None, endTime=None, provisional=False):
+        self.channelId = channelId
+        self.title = title
+        self.image = image
+        self.sourceType = sourceType
+        self.paused = paused
+        self.channelTitle = channelTitle
+        self.position = None
+        self.speed = 0
+        self.positionTimestamp = None
+        self.startTime = startTime
+        self.endTime = endTime
+        self.provisional = provisional
+
+    def frozen(self):
+        """Returns a read-only copy"""
+        info = object.__new__(_FrozenBoxPlayingInfo)
+        info.__dict__.update(self.__dict__)
+        return info
 
     def setPaused(self, paused: bool):
         self.paused = paused
@@ -42,6 +64,58 @@ class ZiggoNextBoxPlayingInfo:
     def setSourceType(self, sourceType):
         self.sourceType = sourceType
 
+    def setPlayback(self, position, speed, timestamp):
+        """Position in ms as reported by the box, received at timestamp (epoch seconds)"""
+        self.position = position
+        self.speed = speed
+        self.positionTimestamp = timestamp
+
+    def getDuration(self):
+        """Duration of the playing listing in seconds, None when unknown"""
+        if self.startTime is None or self.endTime is None:
+            return None
+        return (self.endTime - self.startTime) / 1000
+
+    def getPosition(self, now: float = None):
+        """Current position in seconds, extrapolated from the last status without contacting the box"""
+        if now is None:
+            now = time.time()
+        if self.position is not None and self.positionTimestamp is not None:
+            position = self.position / 1000 + (now - self.positionTimestamp) * self.speed
+        elif self.startTime is not None and self.speed:
+            position = now - self.startTime / 1000
+        else:
+            return None
+        duration = self.getDuration()
+        if duration is not None:
+            position = min(position, duration)
+        return max(position, 0)
+
+class _FrozenBoxPlayingInfo(ZiggoNextBoxPlayingInfo):
+    """Published ZiggoNextBoxPlayingInfo, modifying it raises AttributeError."""
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ZiggoNextBoxPlayingInfo is read-only once published")
+
+    def __delattr__(self, name):
+        raise AttributeError("ZiggoNextBoxPlayingInfo is read-only once published")
+
+    def frozen(self):
+        return self
+
+class ZiggoNextBoxSnapshot(NamedTuple):
+    """Immutable view of a settop box. The info is a read-only copy made when publishing."""
+    box_id: str
+    name: str
+    state: str
+    info: ZiggoNextBoxPlayingInfo
+    version: int
+
+class ZiggoNextSnapshot(NamedTuple):
+    """Immutable view of all settop boxes"""
+    version: int
+    boxes: Mapping[str, ZiggoNextBoxSnapshot] = MappingProxyType({})
+
 class ZiggoChannel:
     serviceId: str
     title: str
@@ -56,6 +130,22 @@ class ZiggoChannel:
         self.logoImage = logoImage
         self.channelNumber = channelNumber
 
+class ZiggoListing:
+    listing_id: str
+    title: str
+    channel_id: str
+    image: str
+    start_time: int
+    end_time: int
+
+    def __init__(self, listing_id, title, channel_id, image, start_time, end_time):
+        self.listing_id = listing_id
+        self.title = title
+        self.channel_id = channel_id
+        self.image = image
+        self.start_time = start_time
+        self.end_time = end_time
+
 class ZiggoRecordingSingle:
     recording_id: str
     title: str
@@ -0,0 +1,197 @@
+"""Prioritised, rate limited outbound MQTT publishing."""
+import logging
+import threading
+import time
+from collections import deque
+from logging import Logger
+
+from .const import PUBLISH_PRIORITY_COMMAND, PUBLISH_PRIORITY_STATUS
+
+STOP_FLUSH_TIMEOUT = 2.0
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= 1
+
+    def take(self):
+        self.tokens -= 1
+
+    def wait_time(self, now: float) -> float:
+        self._refill(now)
+        return max(0, (1 - self.tokens) / self.rate)
+
+
+class _Message:
+    __slots__ = ("topic", "payload", "priority", "box_id", "qos", "queued")
+
+    def __init__(self, topic, payload, priority, box_id, qos, queued):
+        self.topic = topic
+        self.payload = payload
+        self.priority = priority
+        self.box_id = box_id
+        self.qos = qos
+        self.queued = queued
+
+
+class ZiggoNextPublisher:
+    """Queues outbound MQTT messages and publishes them from a worker thread.
+
+    Messages are sent in priority order (user commands before status polls)
+    and are limited by a token bucket per connection and one per box. A
+    status poll for a box that already has one queued is dropped.
+    """
+
+    def __init__(
+        self,
+        connection_rate: float = 20,
+        connection_burst: int = 40,
+        box_rate: float = 5,
+        box_burst: int = 10,
+        command_qos: int = 0,
+        status_qos: int = 0,
+    ):
+        self.box_rate = box_rate
+        self.box_burst = box_burst
+        self.qos = {PUBLISH_PRIORITY_COMMAND: command_qos, PUBLISH_PRIORITY_STATUS: status_qos}
+        self._connection_bucket = _TokenBucket(connection_rate, connection_burst)
+        self._box_buckets = {}
+        self._queues = {PUBLISH_PRIORITY_COMMAND: deque(), PUBLISH_PRIORITY_STATUS: deque()}
+        self._condition = threading.Condition()
+        self._client = None
+        self.logger = logging.getLogger(__name__)
+        self._thread = None
+        self._running = False
+        self._flush_deadline = 0.0
+        self._published = 0
+        self._failed = 0
+        self._coalesced = 0
+        self._latency = {priority: [0, 0.0, 0.0] for priority in self._queues}
+
+    def start(self, client, logger: Logger = None):
+        """Starts publishing queued messages to the given mqtt client, logging failed publishes to logger"""
+        with self._condition:
+            self._client = client
+            if logger is not None:
+                self.logger = logger
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="ziggonext-publisher", daemon=True)
+        self._thread.start()
+
+    def stop(self, flush_timeout: float = STOP_FLUSH_TIMEOUT):
+        """Stops the worker once the queued commands are published, waiting at most flush_timeout
+        seconds for them. Queued status polls are not sent."""
+        with self._condition:
+            self._running = False
+            self._flush_deadline = time.monotonic() + flush_timeout
+            self._condition.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def publish(self, topic: str, payload: str, priority: int = PUBLISH_PRIORITY_COMMAND, box_id: str = None, qos: int = None):
+        """Queues a message; qos defaults to the qos configured for priority"""
+        if qos is None:
+            qos = self.qos[priority]
+        message = _Message(topic, payload, priority, box_id, qos, time.monotonic())
+        with self._condition:
+            queue = self._queues[priority]
+            if priority == PUBLISH_PRIORITY_STATUS and any(queued.box_id == box_id for queued in queue):
+                self._coalesced += 1
+                return
+            queue.append(message)
+            self._condition.notify()
+
+    def _box_bucket(self, box_id):
+        bucket = self._box_buckets.get(box_id)
+        if bucket is None:
+            bucket = _TokenBucket(self.box_rate, self.box_burst)
+            self._box_buckets[box_id] = bucket
+        return bucket
+
+    def _next_message(self, now: float, priorities):
+        """Returns the next sendable message, or the time to wait for one"""
+        if not self._connection_bucket.available(now):
+            return None, self._connection_bucket.wait_time(now)
+        wait = None
+        for priority in priorities:
+            queue = self._queues[priority]
+            for message in queue:
+                bucket = self._box_bucket(message.box_id)
+                if bucket.available(now):
+                    queue.remove(message)
+                    bucket.take()
+                    self._connection_bucket.take()
+                    return message, None
+                box_wait = bucket.wait_time(now)
+                wait = box_wait if wait is None else min(wait, box_wait)
+        return None, wait
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    now = time.monotonic()
+                    if self._running:
+                        message, wait = self._next_message(now, sorted(self._queues))
+                    else:
+                        commands = len(self._queues[PUBLISH_PRIORITY_COMMAND])
+                        if not commands:
+                            return
+                        if now >= self._flush_deadline:
+                            self.logger.warning("Stopped publishing with %d commands queued", commands)
+                            return
+                        message, wait = self._next_message(now, (PUBLISH_PRIORITY_COMMAND,))
+                        if wait is not None:
+                            wait = min(wait, self._flush_deadline - now)
+                    if message is not None:
+                        break
+                    self._condition.wait(wait)
+                client = self._client
+            try:
+                client.publish(message.topic, message.payload, qos=message.qos)
+            except Exception:
+                self.logger.exception("Publishing to %s failed", message.topic)
+                with self._condition:
+                    self._failed += 1
+                continue
+            latency = time.monotonic() - message.queued
+            with self._condition:
+                self._published += 1
+                stats = self._latency[message.priority]
+                stats[0] += 1
+                stats[1] += latency
+                stats[2] = max(stats[2], latency)
+
+    def get_metrics(self):
+        """Returns worker liveness, queue depth, publish counts and latency (seconds) per priority"""
+        with self._condition:
+            thread = self._thread
+            return {
+                "running": thread is not None and thread.is_alive(),
+                "queue_depth": {priority: len(queue) for priority, queue in self._queues.items()},
+                "published": self._published,
+                "failed": self._failed,
+                "coalesced": self._coalesced,
+                "latency": {
+                    priority: {
+                        "count": count,
+                        "average": total / count if count else 0.0,
+                        "max": maximum,
+                    }
+                    for priority, (count, total, maximum) in self._latency.items()
+                },
+            }
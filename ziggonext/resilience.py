@@ -0,0 +1,122 @@
+"""Retry policy, circuit breaker and stale response cache for API calls."""
+import random
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class ZiggoNextRetryPolicy:
+    """Exponential backoff with full jitter, honouring Retry-After headers."""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 10.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def get_delay(self, attempt: int, response=None) -> float:
+        """Seconds to wait before the given retry attempt (1 based)"""
+        retry_after = _parse_retry_after(response)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+def _parse_retry_after(response):
+    if response is None:
+        return None
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class ZiggoNextCircuitBreaker:
+    """Fails fast for a host after repeated failures.
+
+    The breaker opens after failure_threshold consecutive failures. After
+    reset_timeout seconds a single trial call is let through (half open);
+    its outcome closes or reopens the breaker.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CIRCUIT_CLOSED:
+                return True
+            if self.state == CIRCUIT_OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = CIRCUIT_HALF_OPEN
+                self._trial_running = False
+            if self.state == CIRCUIT_HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CIRCUIT_CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == CIRCUIT_HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != CIRCUIT_OPEN:
+                    self.opened += 1
+                self.state = CIRCUIT_OPEN
+                self._opened_at = time.monotonic()
+                self._trial_running = False
+
+    def get_metrics(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+
+
+class _ResponseCache:
+    """Bounded LRU cache of the last successful response per url."""
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, url: str, response):
+        with self._lock:
+            self._responses[url] = response
+            self._responses.move_to_end(url)
+            while len(self._responses) > self.max_size:
+                self._responses.popitem(last=False)
+
+    def get(self, url: str):
+        with self._lock:
+            return self._responses.get(url)
@@ -0,0 +1,219 @@
+"""In-memory search index over channels, recordings and listings."""
+import heapq
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, NamedTuple
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _normalize(text: str) -> str:
+    """Lowercases text and strips accents."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _tokenize(text: str):
+    return _TOKEN_PATTERN.findall(_normalize(text))
+
+
+class ZiggoSearchResult(NamedTuple):
+    kind: str
+    id: str
+    title: str
+    score: int
+    item: Any
+
+
+class _Entry(NamedTuple):
+    kind: str
+    id: str
+    title: str
+    normalized: str
+    tokens: frozenset
+    leading: str
+    item: Any
+
+
+class ZiggoNextSearchIndex:
+    """Inverted index from normalized tokens and their prefixes to entries.
+
+    Entries are keyed by (kind, id) and can be added, replaced and removed
+    incrementally. Every query token has to match a token of the title,
+    either completely or as a prefix. max_entries limits the number of
+    entries per kind, the least recently added ones are evicted.
+
+    Besides the prefixes the index keeps the exact tokens and the prefixes
+    of the leading token of every title, so results are ranked with set
+    operations per score instead of scoring every candidate.
+    """
+
+    def __init__(self, max_entries=None):
+        self._entries = {}
+        self._prefixes = {}
+        self._tokens = {}
+        self._leading = {}
+        self._lengths = {}
+        self._by_length = {}
+        self._max_entries = dict(max_entries or {})
+        self._order = {kind: OrderedDict() for kind in self._max_entries}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, kind: str, item_id: str, title: str, item=None):
+        """Adds or replaces an entry"""
+        if not title:
+            self.remove(kind, item_id)
+            return
+        key = (kind, item_id)
+        existing = self._entries.get(key)
+        if existing is not None and existing.title == title:
+            with self._lock:
+                if self._entries.get(key) is existing:
+                    self._entries[key] = existing._replace(item=item)
+                    self._touch(key)
+                    return
+        normalized = _normalize(title)
+        tokens = frozenset(_TOKEN_PATTERN.findall(normalized))
+        leading = _TOKEN_PATTERN.match(normalized)
+        entry = _Entry(kind, item_id, title, normalized, tokens, leading.group() if leading else None, item)
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                self._unlink(key, existing)
+            self._entries[key] = entry
+            self._lengths[key] = len(title)
+            self._by_length.setdefault(len(title), set()).add(key)
+            for token in tokens:
+                self._tokens.setdefault(token, set()).add(key)
+                for length in range(1, len(token) + 1):
+                    self._prefixes.setdefault(token[:length], set()).add(key)
+            if entry.leading is not None:
+                for length in range(1, len(entry.leading) + 1):
+                    self._leading.setdefault(entry.leading[:length], set()).add(key)
+            self._touch(key)
+
+    def _touch(self, key):
+        order = self._order.get(key[0])
+        if order is None:
+            return
+        order[key] = None
+        order.move_to_end(key)
+        while len(order) > self._max_entries[key[0]]:
+            evicted, _ = order.popitem(last=False)
+            self._unlink(evicted, self._entries.pop(evicted))
+
+    def get(self, kind: str, item_id: str):
+        """Returns the item of an entry, None when it is not indexed"""
+        entry = self._entries.get((kind, item_id))
+        return entry.item if entry is not None else None
+
+    def remove(self, kind: str, item_id: str):
+        key = (kind, item_id)
+        with self._lock:
+            existing = self._entries.pop(key, None)
+            if existing is not None:
+                self._unlink(key, existing)
+                self._order.get(kind, {}).pop(key, None)
+
+    def retain(self, kind: str, item_ids):
+        """Removes all entries of kind that are not in item_ids"""
+        item_ids = set(item_ids)
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == kind and key[1] not in item_ids]
+            for key in stale:
+                self._unlink(key, self._entries.pop(key))
+                self._order.get(kind, {}).pop(key, None)
+
+    def _unlink(self, key, entry: _Entry):
+        self._lengths.pop(key, None)
+        _discard(self._by_length, len(entry.title), key)
+        for token in entry.tokens:
+            _discard(self._tokens, token, key)
+            for length in range(1, len(token) + 1):
+                _discard(self._prefixes, token[:length], key)
+        if entry.leading is not None:
+            for length in range(1, len(entry.leading) + 1):
+                _discard(self._leading, entry.leading[:length], key)
+
+    def search(self, query: str, kinds=None, limit: int = 10):
+        """Returns up to limit ranked results for query, optionally restricted to kinds.
+
+        A query token scores 2 when it matches a title token completely and 1
+        when it is a prefix, a title starting with the query scores 1 more.
+        Shorter titles rank first within a score.
+        """
+        tokens = _tokenize(query)
+        if not tokens or limit <= 0:
+            return []
+        normalized_query = " ".join(tokens)
+        with self._lock:
+            matches = [self._prefixes.get(token) for token in tokens]
+            if not all(matches):
+                return []
+            matches.sort(key=len)
+            candidates = matches[0].intersection(*matches[1:]) if len(matches) > 1 else matches[0]
+            if kinds is not None:
+                candidates = {key for key in candidates if key[0] in kinds}
+            # by_exact[count] holds the candidates matching count query tokens completely,
+            # the ones matching none are only collected when the better groups run short
+            by_exact = [None]
+            matched = set()
+            for token in tokens:
+                exact = candidates.intersection(self._tokens.get(token, ()))
+                by_exact = [None] + [
+                    (by_exact[count] if count < len(by_exact) else set()).difference(exact).union(
+                        by_exact[count - 1].intersection(exact) if count > 1 else exact.difference(matched)
+                    )
+                    for count in range(1, len(by_exact) + 1)
+                ]
+                matched |= exact
+            starts = candidates.intersection(self._leading.get(tokens[0], ()))
+            if len(tokens) > 1:
+                starts = {key for key in starts if self._entries[key].normalized.startswith(normalized_query)}
+
+            results = []
+            for bonus in range(len(tokens) + 1, -1, -1):
+                if bonus == 0:
+                    group = candidates.difference(matched, starts)
+                elif bonus <= len(tokens):
+                    group = by_exact[bonus].difference(starts)
+                else:
+                    group = set()
+                if bonus == 1:
+                    group.update(starts.difference(matched))
+                elif bonus > 1:
+                    group.update(starts.intersection(by_exact[bonus - 1]))
+                best = self._shortest(group, limit - len(results))
+                results.extend(self._result(key, len(tokens) + bonus) for key in best)
+                if len(results) >= limit:
+                    break
+            return results
+
+    def _shortest(self, keys, limit):
+        """Returns the limit keys with the shortest titles"""
+        if len(keys) <= limit * 8:
+            return heapq.nsmallest(limit, keys, key=self._lengths.__getitem__)
+        shortest = []
+        for length in sorted(self._by_length):
+            shortest.extend(keys.intersection(self._by_length[length]))
+            if len(shortest) >= limit:
+                break
+        return shortest[:limit]
+
+    def _result(self, key, score):
+        entry = self._entries[key]
+        return ZiggoSearchResult(entry.kind, entry.id, entry.title, score, entry.item)
+
+
+def _discard(index, token, key):
+    keys = index.get(token)
+    if keys is None:
+        return
+    keys.discard(key)
+    if not keys:
+        del index[token]
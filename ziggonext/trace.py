@@ -0,0 +1,172 @@
+"""Record and replay of Ziggo Next MQTT and HTTP traffic."""
+import gzip
+import json
+import threading
+import time
+
+TRACE_KIND_SESSION = "s"
+TRACE_KIND_MQTT = "m"
+TRACE_KIND_HTTP = "h"
+TRACE_REDACTED_FIELDS = ("token", "oespToken", "refreshToken")
+TRACE_REDACTED = "REDACTED"
+
+
+def _open_trace(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _redact(text: str) -> str:
+    if not any('"' + field + '"' in text for field in TRACE_REDACTED_FIELDS):
+        return text
+    try:
+        body = json.loads(text)
+    except ValueError:
+        return text
+    if not isinstance(body, dict):
+        return text
+    for field in TRACE_REDACTED_FIELDS:
+        if field in body:
+            body[field] = TRACE_REDACTED
+    return json.dumps(body)
+
+
+class ZiggoNextTraceRecorder:
+    """Writes inbound traffic to a json-lines trace file.
+
+    Every line holds an offset in seconds since the start of the capture
+    ("t"), a kind ("k") and the kind specific fields. Files ending in .gz
+    are compressed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = _open_trace(path, "w")
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _write(self, kind: str, **fields):
+        entry = {"t": round(time.monotonic() - self._start, 4), "k": kind}
+        entry.update(fields)
+        line = json.dumps(entry, separators=(",", ":"))
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line + "\n")
+
+    def record_session(self, householdId: str, locationId: str, client_id: str):
+        """Records the session details needed to rebuild the client offline."""
+        self._write(TRACE_KIND_SESSION, hh=householdId, loc=locationId, cid=client_id)
+
+    def record_mqtt(self, topic: str, payload):
+        if isinstance(payload, bytes):
+            payload = payload.decode("utf-8")
+        self._write(TRACE_KIND_MQTT, topic=topic, p=payload)
+
+    def record_http(self, url: str, response):
+        """Records a response, replacing credentials in its body."""
+        self._write(TRACE_KIND_HTTP, url=url, s=response.status_code, b=_redact(response.text))
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class _TraceMessage:
+    """Stand-in for a paho MQTTMessage."""
+
+    def __init__(self, topic: str, payload: str):
+        self.topic = topic
+        self.payload = payload.encode("utf-8")
+
+
+class _TraceResponse:
+    """Stand-in for a requests Response."""
+
+    def __init__(self, url: str, status_code: int, text: str):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.headers = {}
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def json(self):
+        return json.loads(self.text)
+
+    def iter_content(self, chunk_size=1, decode_unicode=False):
+        content = self.text if decode_unicode else self.text.encode("utf-8")
+        for start in range(0, len(content), chunk_size):
+            yield content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class ZiggoNextTraceReplayer:
+    """Replays a captured trace without network access.
+
+    HTTP responses are served per url in the order they were captured, the
+    last one is repeated once a url runs out. MQTT messages are delivered
+    with their original spacing divided by speed; a speed of 0 delivers them
+    as fast as possible. The replayer also acts as the mqtt client of the
+    replayed boxes, outgoing publishes are counted and dropped.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0):
+        self.path = path
+        self.speed = speed
+        self.householdId = None
+        self.locationId = None
+        self.client_id = None
+        self.published = 0
+        self._messages = []
+        self._responses = {}
+        self._load()
+
+    def _load(self):
+        with _open_trace(self.path, "r") as trace:
+            for line in trace:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                kind = entry["k"]
+                if kind == TRACE_KIND_MQTT:
+                    self._messages.append((entry["t"], entry["topic"], entry["p"]))
+                elif kind == TRACE_KIND_HTTP:
+                    self._responses.setdefault(entry["url"], []).append((entry["s"], entry["b"]))
+                elif kind == TRACE_KIND_SESSION and self.householdId is None:
+                    self.householdId = entry["hh"]
+                    self.locationId = entry["loc"]
+                    self.client_id = entry["cid"]
+
+    def get(self, url: str, **kwargs):
+        """Serves a captured response for url."""
+        responses = self._responses.get(url)
+        if not responses:
+            return _TraceResponse(url, 404, "null")
+        status_code, body = responses.pop(0) if len(responses) > 1 else responses[0]
+        return _TraceResponse(url, status_code, body)
+
+    def publish(self, topic, payload=None, qos=0, retain=False):
+        self.published += 1
+
+    def subscribe(self, topic, qos=0):
+        pass
+
+    def run(self, on_message):
+        """Feeds all captured MQTT messages to on_message(client, userdata, message)."""
+        started = time.monotonic()
+        first = self._messages[0][0] if self._messages else 0
+        for offset, topic, payload in self._messages:
+            if self.speed:
+                delay = (offset - first) / self.speed - (time.monotonic() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            on_message(self, None, _TraceMessage(topic, payload))
+        return len(self._messages)
@@ -0,0 +1,184 @@
+"""Stall detection and profiling of MQTT message handlers and callbacks."""
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from contextlib import contextmanager
+from logging import Logger
+
+
+@contextmanager
+def _unmeasured():
+    """Stand-in for ZiggoNextWatchdog.measure() while the watchdog is disabled"""
+    yield
+
+
+class ZiggoNextStall:
+    """A handler or callback that ran longer than the watchdog threshold."""
+
+    def __init__(self, name, box_id, message_type, duration, stack):
+        self.name = name
+        self.box_id = box_id
+        self.message_type = message_type
+        self.duration = duration
+        self.stack = stack
+
+
+class _Running:
+    __slots__ = ("name", "box_id", "message_type", "thread", "started", "reported")
+
+    def __init__(self, name, box_id, message_type):
+        self.name = name
+        self.box_id = box_id
+        self.message_type = message_type
+        self.thread = threading.current_thread().name
+        self.started = time.monotonic()
+        self.reported = False
+
+
+class ZiggoNextWatchdog:
+    """Measures handlers and callbacks and reports the ones that stall.
+
+    A monitor thread checks running handlers every threshold / 2 seconds and
+    reports a stall with the stack of the blocked thread while it is still
+    blocked. Reports are logged, kept in a bounded list and passed to
+    stall_callback when given. start_profiling() samples the stacks of
+    threads that are inside a measured handler.
+    """
+
+    def __init__(self, logger: Logger = None, threshold: float = 0.5, stall_callback=None, max_stalls: int = 100):
+        self.logger = logger if logger is not None else logging.getLogger(__name__)
+        self.threshold = threshold
+        self.stall_callback = stall_callback
+        self.stalls = deque(maxlen=max_stalls)
+        self._running = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._monitor = None
+        self._profile = Counter()
+        self._profiling = threading.Event()
+        self._profiler = None
+
+    def start(self):
+        self._stopped.clear()
+        self._monitor = threading.Thread(target=self._run_monitor, name="ziggonext-watchdog", daemon=True)
+        self._monitor.start()
+
+    def stop(self):
+        self._stopped.set()
+        self.stop_profiling()
+        if self._monitor is not None:
+            self._monitor.join()
+            self._monitor = None
+
+    @contextmanager
+    def measure(self, name: str, box_id: str = None, message_type: str = None):
+        """Measures the enclosed block as handler name"""
+        ident = threading.get_ident()
+        running = _Running(name, box_id, message_type)
+        with self._lock:
+            self._running.setdefault(ident, []).append(running)
+        try:
+            yield
+        finally:
+            duration = time.monotonic() - running.started
+            with self._lock:
+                stack = self._running[ident]
+                stack.pop()
+                if not stack:
+                    del self._running[ident]
+                stats = self._stats.setdefault(name, [0, 0.0, 0.0])
+                stats[0] += 1
+                stats[1] += duration
+                stats[2] = max(stats[2], duration)
+                report = duration > self.threshold and not running.reported
+                running.reported = True
+            if report:
+                self._report(running, duration, None)
+
+    def _report(self, running: _Running, duration: float, stack):
+        stall = ZiggoNextStall(running.name, running.box_id, running.message_type, duration, stack)
+        self.stalls.append(stall)
+        self.logger.warning(
+            "%s for box %s (%s) blocked thread %s for %.3fs%s",
+            running.name,
+            running.box_id,
+            running.message_type,
+            running.thread,
+            duration,
+            "\n" + "".join(stack) if stack else "",
+        )
+        if self.stall_callback:
+            try:
+                self.stall_callback(stall)
+            except Exception:
+                self.logger.exception("Stall callback failed")
+
+    def _run_monitor(self):
+        while not self._stopped.wait(self.threshold / 2):
+            now = time.monotonic()
+            frames = None
+            stalled = []
+            with self._lock:
+                for ident, stack in self._running.items():
+                    running = stack[-1]
+                    if not running.reported and now - running.started > self.threshold:
+                        running.reported = True
+                        stalled.append((ident, running))
+            if stalled:
+                frames = sys._current_frames()
+            for ident, running in stalled:
+                frame = frames.get(ident)
+                stack = traceback.format_stack(frame) if frame is not None else None
+                self._report(running, now - running.started, stack)
+
+    def start_profiling(self, interval: float = 0.005):
+        """Starts sampling the stacks of measured handlers every interval seconds"""
+        if self._profiler is not None:
+            return
+        self._profiling.set()
+        self._profiler = threading.Thread(target=self._run_profiler, args=(interval,), name="ziggonext-profiler", daemon=True)
+        self._profiler.start()
+
+    def stop_profiling(self):
+        self._profiling.clear()
+        if self._profiler is not None:
+            self._profiler.join()
+            self._profiler = None
+
+    def _run_profiler(self, interval: float):
+        while self._profiling.is_set():
+            with self._lock:
+                idents = list(self._running)
+            if idents:
+                frames = sys._current_frames()
+                for ident in idents:
+                    frame = frames.get(ident)
+                    if frame is None:
+                        continue
+                    entries = traceback.extract_stack(frame)
+                    key = ";".join(f"{entry.filename.rsplit('/', 1)[-1]}:{entry.name}" for entry in entries)
+                    with self._lock:
+                        self._profile[key] += 1
+            time.sleep(interval)
+
+    def get_profile(self, limit: int = 20):
+        """Returns the most sampled handler stacks (collapsed, root first) with their sample count"""
+        with self._lock:
+            return self._profile.most_common(limit)
+
+    def reset_profile(self):
+        with self._lock:
+            self._profile.clear()
+
+    def get_metrics(self):
+        """Returns count, average and max duration per handler and the number of stalls"""
+        with self._lock:
+            handlers = {
+                name: {"count": count, "average": total / count if count else 0.0, "max": maximum}
+                for name, (count, total, maximum) in self._stats.items()
+            }
+        return {"handlers": handlers, "stalls": len(self.stalls)}
@@ -7,10 +7,20 @@ import random
 import time
 import sys, traceback
 import re
+import threading
+from types import MappingProxyType
+from urllib.parse import urlsplit
 
 import requests
-from .models import ZiggoNextSession, ZiggoChannel, ZiggoRecordingSingle, ZiggoRecordingShow
+from .models import ZiggoNextSession, ZiggoNextSnapshot, ZiggoChannel, ZiggoRecordingSingle, ZiggoRecordingShow
 from .ziggonextbox import ZiggoNextBox
+from .trace import ZiggoNextTraceRecorder, ZiggoNextTraceReplayer
+from .search import ZiggoNextSearchIndex
+from .jsonstream import iter_json_array
+from .publisher import ZiggoNextPublisher
+from .watchdog import ZiggoNextWatchdog, _unmeasured
+from .events import ZiggoNextSubscription
+from .resilience import ZiggoNextRetryPolicy, ZiggoNextCircuitBreaker, _ResponseCache, RETRY_STATUS_CODES
 from .exceptions import ZiggoNextConnectionError, ZiggoNextAuthenticationError
 
 from .const import (
@@ -33,10 +43,20 @@ from .const import (
     COUNTRY_URLS_HTTP,
     COUNTRY_URLS_MQTT,
     COUNTRY_URLS_PERSONALIZATION_FORMAT,
-    BE_AUTH_URL
+    BE_AUTH_URL,
+    SEARCH_KIND_CHANNEL,
+    SEARCH_KIND_RECORDING,
+    SEARCH_KIND_SHOW,
+    SEARCH_KIND_LISTING,
+    OVERFLOW_DROP_OLDEST,
 )
 
 DEFAULT_PORT = 443
+CHANNELS_CHUNK_SIZE = 64 * 1024
+API_CALL_MAX_TRIES = 10
+DISCOVERY_MIN_INTERVAL = 60
+SEARCH_MAX_LISTINGS = 1000
+DEFAULT_STATUS_SETTLE_WINDOW = None
 
 def _makeId(stringLength=10):
     letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
@@ -64,6 +84,26 @@ class ZiggoNext:
         self._api_url_channels =  self.baseUrl + "/channels"
         self._api_url_recordings = self.baseUrl + "/networkdvrrecordings"
         self._api_url_authorization =  self.baseUrl + "/authorization"
+        self._recorder = None
+        self._replayer = None
+        self._snapshot_lock = threading.Lock()
+        self._snapshot = ZiggoNextSnapshot(0)
+        self._search_index = ZiggoNextSearchIndex({SEARCH_KIND_LISTING: SEARCH_MAX_LISTINGS})
+        self.publisher = ZiggoNextPublisher()
+        self.retry_policy = ZiggoNextRetryPolicy()
+        self._circuit_breakers = {}
+        self._circuit_breakers_lock = threading.Lock()
+        self._response_cache = _ResponseCache()
+        # credentials are never served stale
+        self._uncached_urls = (self._api_url_session, self._api_url_token)
+        self._watchdog = None
+        self._subscriptions = ()
+        self._status_settle_window = DEFAULT_STATUS_SETTLE_WINDOW
+        self._discovery_lock = threading.Lock()
+        self._discovery_running = False
+        self._discovery_last = -DISCOVERY_MIN_INTERVAL
+        self._pending_device_states = {}
+        self._ignored_devices = set()
 
     def authenticate(self):
         payload = {"username": self.username, "password": self.password}
@@ -185,10 +225,110 @@ class ZiggoNext:
     def _register_settop_boxes(self):
         """Get settopxes"""
         jsonResult = self._do_api_call(self._api_url_settop_boxes)
+        settop_boxes = {}
         for box in jsonResult:
             if box["platformType"] == "EOS" or box["platformType"] == "HORIZON":
-                box_id = box["deviceId"]
-                self.settop_boxes[box_id] = ZiggoNextBox(box_id, box["settings"]["deviceFriendlyName"], self.session.householdId, self.token, self._country_code, self.logger, self.mqttClient, self.mqttClientId)
+                settop_boxes[box["deviceId"]] = self._create_settop_box(box)
+        previous = self.settop_boxes
+        self.settop_boxes = settop_boxes
+        for settop_box in previous.values():
+            settop_box.stop()
+        with self._snapshot_lock:
+            # drops the boxes that are no longer registered
+            boxes = {box_id: settop_box.snapshot() for box_id, settop_box in settop_boxes.items()}
+            self._snapshot = ZiggoNextSnapshot(self._snapshot.version + 1, MappingProxyType(boxes))
+        with self._discovery_lock:
+            self._ignored_devices.clear()
+
+    def _create_settop_box(self, box):
+        box_id = box["deviceId"]
+        settop_box = ZiggoNextBox(box_id, box["settings"]["deviceFriendlyName"], self.session.householdId, self.token, self._country_code, self.logger, self.mqttClient, self.mqttClientId, self._box_http_get, self._on_box_snapshot, self._search_index, self.publisher)
+        settop_box.set_watchdog(self._watchdog)
+        settop_box.set_status_settle_window(self._status_settle_window)
+        settop_box.channels = self.channels
+        self._on_box_snapshot(settop_box.snapshot())
+        return settop_box
+
+    def _on_unknown_device(self, deviceId, jsonPayload):
+        """Schedules a de-duplicated, rate limited discovery of new settop boxes"""
+        with self._discovery_lock:
+            if deviceId in self._ignored_devices:
+                return
+            if jsonPayload.get("deviceType") == "STB":
+                self._pending_device_states[deviceId] = jsonPayload
+            else:
+                self._pending_device_states.setdefault(deviceId, None)
+            if self._discovery_running or time.monotonic() - self._discovery_last < DISCOVERY_MIN_INTERVAL:
+                return
+            self._discovery_running = True
+            self._discovery_last = time.monotonic()
+        self.logger.debug("Message from unknown device %s, refreshing settop boxes", deviceId)
+        threading.Thread(target=self._discover_settop_boxes, name="ziggonext-discovery", daemon=True).start()
+
+    def _discover_settop_boxes(self):
+        """Registers settop boxes added to the household without touching the existing ones.
+        Unknown devices that are still not registered afterwards are ignored from then on."""
+        try:
+            jsonResult = self._do_api_call(self._api_url_settop_boxes)
+            new_boxes = {}
+            for box in jsonResult:
+                if box["platformType"] == "EOS" or box["platformType"] == "HORIZON":
+                    if box["deviceId"] not in self.settop_boxes:
+                        new_boxes[box["deviceId"]] = self._create_settop_box(box)
+            if new_boxes:
+                self.settop_boxes = {**self.settop_boxes, **new_boxes}
+            with self._discovery_lock:
+                pending = self._pending_device_states
+                self._pending_device_states = {}
+                for deviceId in pending:
+                    if deviceId not in self.settop_boxes:
+                        self._ignored_devices.add(deviceId)
+            for box_id, settop_box in new_boxes.items():
+                self.logger.info("Discovered settop box %s", settop_box.name)
+                if pending.get(box_id) is not None:
+                    settop_box._update_settopbox_state(pending[box_id])
+                elif box_id in pending:
+                    # only seen sending statuses, so the box is running
+                    settop_box._update_settopbox_state({"source": box_id, "state": ONLINE_RUNNING})
+                else:
+                    settop_box._subscribe_box_topics()
+                    settop_box._request_settop_box_state()
+        except Exception:
+            self.logger.exception("Settop box discovery failed")
+        finally:
+            with self._discovery_lock:
+                self._discovery_running = False
+
+    def _on_box_snapshot(self, box_snapshot):
+        """Publishes a new client snapshot containing the new box snapshot"""
+        with self._snapshot_lock:
+            boxes = dict(self._snapshot.boxes)
+            boxes[box_snapshot.box_id] = box_snapshot
+            self._snapshot = ZiggoNextSnapshot(self._snapshot.version + 1, MappingProxyType(boxes))
+            subscriptions = self._subscriptions
+        for subscription in subscriptions:
+            subscription.put(box_snapshot)
+
+    def subscribe(self, max_size: int = 100, overflow: str = OVERFLOW_DROP_OLDEST, block_timeout: float = None):
+        """Returns a ZiggoNextSubscription that receives a ZiggoNextBoxSnapshot for every box change,
+        starting with the current state of every box. Iterate it, or async iterate it, and close it when done.
+        The block overflow policy requires block_timeout, a full queue then holds up message processing for
+        at most that many seconds per event."""
+        subscription = ZiggoNextSubscription(max_size, overflow, block_timeout, self._unsubscribe)
+        with self._snapshot_lock:
+            # queued under the lock, so later changes can not be overtaken by the initial state
+            for box_snapshot in self._snapshot.boxes.values():
+                subscription.put(box_snapshot, wait=False)
+            self._subscriptions = self._subscriptions + (subscription,)
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        with self._snapshot_lock:
+            self._subscriptions = tuple(s for s in self._subscriptions if s is not subscription)
+
+    def snapshot(self) -> ZiggoNextSnapshot:
+        """Returns a consistent, immutable view of all settop boxes without locking"""
+        return self._snapshot
 
     def _on_mqtt_client_connect(self, client, userdata, flags, resultCode):
         """Handling mqtt connect result"""
@@ -214,32 +354,143 @@ class ZiggoNext:
 
     def _on_mqtt_client_message(self, client, userdata, message):
         """Handles messages received by mqtt client"""
+        watchdog = self._watchdog
+        with watchdog.measure("mqtt_message", None, message.topic) if watchdog else _unmeasured():
+            self._handle_mqtt_message(message)
+
+    def _handle_mqtt_message(self, message):
+        recorder = self._recorder
+        if recorder is not None:
+            recorder.record_mqtt(message.topic, message.payload)
         jsonPayload = json.loads(message.payload)
-        deviceId = jsonPayload["source"]
+        deviceId = jsonPayload.get("source")
         self.logger.debug(jsonPayload)
-        if "deviceType" in jsonPayload and jsonPayload["deviceType"] == "STB":
-            self.settop_boxes[deviceId]._update_settopbox_state(jsonPayload)
+        if not isinstance(deviceId, str):
+            # our own commands echoed back have a dict or no source
+            return
+        settop_box = self.settop_boxes.get(deviceId)
+        isSettopBoxState = jsonPayload.get("deviceType") == "STB"
+        if settop_box is None:
+            if isSettopBoxState or "status" in jsonPayload:
+                self._on_unknown_device(deviceId, jsonPayload)
+            return
+        if isSettopBoxState:
+            with self._measure("update_settopbox_state", deviceId, jsonPayload):
+                settop_box._update_settopbox_state(jsonPayload)
         if "status" in jsonPayload:
-            self.settop_boxes[deviceId].update_settop_box(jsonPayload)
-
-    def _do_api_call(self, url, tries = 0):
+            settop_box.submit_status(jsonPayload)
+
+    def _measure(self, name, deviceId, jsonPayload):
+        watchdog = self._watchdog
+        if watchdog is None:
+            return _unmeasured()
+        return watchdog.measure(name, deviceId, jsonPayload.get("type", jsonPayload.get("deviceType")))
+
+    def enable_watchdog(self, threshold: float = 0.5, stall_callback=None):
+        """Measures mqtt message handling, status processing and change callbacks and reports the ones
+        blocking their thread longer than threshold seconds. Returns the ZiggoNextWatchdog, use it to
+        start profiling."""
+        self.disable_watchdog()
+        self._watchdog = ZiggoNextWatchdog(self.logger, threshold, stall_callback)
+        self._watchdog.start()
+        for box in self.settop_boxes.values():
+            box.set_watchdog(self._watchdog)
+        return self._watchdog
+
+    def disable_watchdog(self):
+        watchdog = self._watchdog
+        if watchdog is None:
+            return
+        self._watchdog = None
+        for box in self.settop_boxes.values():
+            box.set_watchdog(None)
+        watchdog.stop()
+
+    def get_watchdog_metrics(self):
+        """Returns handler timings and stall count, None when the watchdog is disabled"""
+        if self._watchdog is None:
+            return None
+        return self._watchdog.get_metrics()
+
+    def _do_api_call(self, url):
         """Executes api call and returns json object"""
-        if tries > 9:
-            raise ZiggoNextConnectionError("API call failed. See previous errors.")
-        headers = {
-            "X-OESP-Token": self.session.oespToken,
-            "X-OESP-Username": self.username,
-        }
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            return response.json()
-        elif response.status_code == 403:
-            self.logger.warning(f"Api call resultcode was 403. Refreshing token en trying again...")
-            self.get_session()
-            tries+=1
-            return self._do_api_call(url, tries)
-        else:
-            raise ZiggoNextConnectionError("API call failed: " + str(response.status_code))
+        for attempt in range(1, API_CALL_MAX_TRIES + 1):
+            headers = {
+                "X-OESP-Token": self.session.oespToken,
+                "X-OESP-Username": self.username,
+            }
+            response = self._http_get(url, headers=headers)
+            if response.status_code == 200:
+                return response.json()
+            elif response.status_code == 403:
+                self.logger.warning(f"Api call resultcode was 403. Refreshing token en trying again...")
+                self.get_session()
+                time.sleep(self.retry_policy.get_delay(attempt, response))
+            else:
+                raise ZiggoNextConnectionError("API call failed: " + str(response.status_code))
+        raise ZiggoNextConnectionError("API call failed. See previous errors.")
+
+    def _get_circuit_breaker(self, host):
+        with self._circuit_breakers_lock:
+            breaker = self._circuit_breakers.get(host)
+            if breaker is None:
+                breaker = ZiggoNextCircuitBreaker()
+                self._circuit_breakers[host] = breaker
+            return breaker
+
+    def _http_get(self, url, retry: bool = True, **kwargs):
+        """Executes a GET request with retries and a circuit breaker per host.
+        Falls back to the last successful response for url while the host is failing,
+        except for the session and token urls.
+        Without retry a failed request is not retried, so the caller never sleeps.
+        Served from or captured to a trace when enabled."""
+        if self._replayer is not None:
+            return self._replayer.get(url, **kwargs)
+        breaker = self._get_circuit_breaker(urlsplit(url).netloc)
+        cacheable = not url.startswith(self._uncached_urls)
+        response = None
+        error = None
+        attempt = 0
+        while breaker.allow():
+            try:
+                response = requests.get(url, **kwargs)
+                error = None
+            except requests.RequestException as exception:
+                response = None
+                error = exception
+            if response is not None and response.status_code not in RETRY_STATUS_CODES:
+                breaker.record_success()
+                recorder = self._recorder
+                if recorder is not None:
+                    recorder.record_http(url, response)
+                if cacheable and response.status_code == 200 and not kwargs.get("stream"):
+                    self._response_cache.put(url, response)
+                return response
+            breaker.record_failure()
+            attempt += 1
+            if not retry or attempt >= self.retry_policy.max_attempts:
+                break
+            time.sleep(self.retry_policy.get_delay(attempt, response))
+
+        stale = self._response_cache.get(url) if cacheable else None
+        if stale is not None:
+            self.logger.warning("Serving stale response for %s", url)
+            return stale
+        if response is not None:
+            return response
+        if error is not None:
+            raise ZiggoNextConnectionError("API call failed: " + str(error))
+        raise ZiggoNextConnectionError("API call rejected, circuit open for " + urlsplit(url).netloc)
+
+    def _box_http_get(self, url, **kwargs):
+        """Listing and mediagroup lookups run on the mqtt thread: fail fast and serve stale responses"""
+        return self._http_get(url, retry=False, **kwargs)
+
+    def get_api_metrics(self):
+        """Returns the circuit breaker state per API host"""
+        with self._circuit_breakers_lock:
+            breakers = dict(self._circuit_breakers)
+        return {host: breaker.get_metrics() for host, breaker in breakers.items()}
 
     def _get_token(self):
         """Get token from Ziggo Next"""
@@ -251,12 +502,12 @@ class ZiggoNext:
         """Get token and start mqtt client for receiving data from Ziggo Next"""
         self._mqtt_broker = COUNTRY_URLS_MQTT[self._country_code]
         self.logger = logger
+        if self._watchdog is not None:
+            self._watchdog.logger = logger
         self.get_session_and_token()
-        if self.session.locationId is not None:
-            self._api_url_channels =  self.baseUrl + "/channels?byLocationId=" + self.session.locationId
-
-        self._api_url_settop_boxes =  COUNTRY_URLS_PERSONALIZATION_FORMAT[self._country_code].format(household_id=self.session.householdId)
+        self._create_session_urls()
         self.mqttClientId = _makeId(30)
+        self._record_session()
         self.mqttClient = mqtt.Client(self.mqttClientId, transport="websockets")
         if enableMqttLogging:
             self.mqttClient.enable_logger(logger)
@@ -265,10 +516,66 @@ class ZiggoNext:
         self.mqttClient.on_connect = self._on_mqtt_client_connect
         self.mqttClient.on_disconnect = self._on_mqtt_client_disconnect
         self.mqttClient.connect(self._mqtt_broker, DEFAULT_PORT)
+        self.publisher.start(self.mqttClient, logger)
         self._register_settop_boxes()
         self.load_channels()
         self.mqttClient.loop_start()
 
+    def _create_session_urls(self):
+        if self.session.locationId is not None:
+            self._api_url_channels =  self.baseUrl + "/channels?byLocationId=" + self.session.locationId
+
+        self._api_url_settop_boxes =  COUNTRY_URLS_PERSONALIZATION_FORMAT[self._country_code].format(household_id=self.session.householdId)
+
+    def _record_session(self):
+        recorder = self._recorder
+        if recorder is not None and self.session is not None:
+            recorder.record_session(self.session.householdId, self.session.locationId, self.mqttClientId)
+
+    def start_capture(self, trace_file: str):
+        """Captures inbound mqtt messages and http responses to trace_file.
+        Start the capture before connect() to make the trace replayable."""
+        self.stop_capture()
+        self._recorder = ZiggoNextTraceRecorder(trace_file)
+        if getattr(self, "mqttClientId", None) is not None:
+            self._record_session()
+
+    def stop_capture(self):
+        """Stops a running capture"""
+        recorder = self._recorder
+        self._recorder = None
+        if recorder is not None:
+            recorder.close()
+
+    def replay(self, logger, trace_file: str, speed: float = 1.0):
+        """Rebuilds the client from a captured trace and replays its mqtt messages without network access.
+        Returns the number of replayed messages."""
+        self.logger = logger
+        if self._watchdog is not None:
+            self._watchdog.logger = logger
+        self._replayer = ZiggoNextTraceReplayer(trace_file, speed)
+        if self._replayer.householdId is None:
+            raise ZiggoNextConnectionError("Trace contains no session: " + trace_file)
+        self.session = ZiggoNextSession(self._replayer.householdId, None, self._replayer.locationId)
+        self._create_session_urls()
+        self.mqttClientId = self._replayer.client_id
+        self.mqttClient = self._replayer
+        self.mqttClientConnected = False
+        self.publisher.start(self._replayer, logger)
+        self._register_settop_boxes()
+        self.load_channels()
+        for box in self.settop_boxes.values():
+            box.register()
+        try:
+            count = self._replayer.run(self._on_mqtt_client_message)
+            for box in self.settop_boxes.values():
+                box.wait_for_status()
+            return count
+        finally:
+            for box in self.settop_boxes.values():
+                box.stop()
+            self.publisher.stop()
+
     def _send_key_to_box(self, box_id: str, key: str):
         self.settop_boxes[box_id].send_key_to_box(key)
 
@@ -279,13 +586,13 @@ class ZiggoNext:
 
     def pause(self, box_id):
         """Pauses the given settopbox"""
-        box = self.settop_boxes[box_id]
+        box = self.settop_boxes[box_id].snapshot()
         if box.state == ONLINE_RUNNING and not box.info.paused:
             self._send_key_to_box(box_id, MEDIA_KEY_PLAY_PAUSE)
 
     def play(self, box_id):
         """Resumes the settopbox"""
-        box = self.settop_boxes[box_id]
+        box = self.settop_boxes[box_id].snapshot()
         if box.state == ONLINE_RUNNING and box.info.paused:
             self._send_key_to_box(box_id, MEDIA_KEY_PLAY_PAUSE)
 
@@ -351,29 +658,30 @@ class ZiggoNext:
 
     def load_channels(self):
         """Refresh channels list for now-playing data."""
-        response = requests.get(self._api_url_channels)
+        response = self._http_get(self._api_url_channels, stream=True)
         self.logger.debug("Channel Url: %s", self._api_url_channels)
         if response.status_code == 200:
-            content = response.json()
-
-            for channel in content["channels"]:
-                station = channel["stationSchedules"][0]["station"]
-                serviceId = station["serviceId"]
-                streamImage = None
-                channelImage = None
-                for image in station["images"]:
-                    if image["assetType"] == "imageStream":
-                        streamImage = image["url"]
-                    if image["assetType"] == "station-logo-small":
-                        channelImage =  image["url"]
-
-                self.channels[serviceId] = ZiggoChannel(
-                    serviceId,
-                    channel["title"],
-                    streamImage,
-                    channelImage,
-                    channel["channelNumber"],
-                )
+            try:
+                for channel in iter_json_array(response.iter_content(CHANNELS_CHUNK_SIZE), "channels"):
+                    station = channel["stationSchedules"][0]["station"]
+                    serviceId = station["serviceId"]
+                    streamImage = None
+                    channelImage = None
+                    for image in station["images"]:
+                        if image["assetType"] == "imageStream":
+                            streamImage = image["url"]
+                        if image["assetType"] == "station-logo-small":
+                            channelImage =  image["url"]
+
+                    self.channels[serviceId] = ZiggoChannel(
+                        serviceId,
+                        channel["title"],
+                        streamImage,
+                        channelImage,
+                        channel["channelNumber"],
+                    )
+            finally:
+                response.close()
             self.channels["NL_000073_019506"] = ZiggoChannel(
                 "NL_000073_019506",
                 "Netflix",
@@ -389,6 +697,9 @@ class ZiggoNext:
                 None,
                 "151"
             )
+            for channel in self.channels.values():
+                self._search_index.add(SEARCH_KIND_CHANNEL, channel.serviceId, channel.title, channel)
+            self._search_index.retain(SEARCH_KIND_CHANNEL, self.channels.keys())
             self.logger.debug("Updated channels.")
             for box in self.settop_boxes.values():
                 box.channels = self.channels
@@ -407,6 +718,8 @@ class ZiggoNext:
             elif recording["type"] == "show":
                 results.append(self._get_show_recording_summary(recording, "mediaGroupId"))
 
+        self._search_index.retain(SEARCH_KIND_RECORDING, [result["recording"].recording_id for result in results if result["type"] == "recording"])
+        self._search_index.retain(SEARCH_KIND_SHOW, [result["show"].media_group_id for result in results if result["type"] == "show"])
         return results
 
     def _get_single_recording(self, payload):
@@ -419,6 +732,7 @@ class ZiggoNext:
             recording.set_episode(payload["episodeNumber"])
         else:
             recording.set_episode(None)
+        self._search_index.add(SEARCH_KIND_RECORDING, recording.recording_id, recording.title, recording)
         return {
             "type": "recording",
             "recording": recording
@@ -442,15 +756,54 @@ class ZiggoNext:
 
     def _get_show_recording_summary(self, recording_payload, group_id):
         show_recording = ZiggoRecordingShow(recording_payload[group_id], recording_payload["title"],recording_payload["numberOfEpisodes"],  recording_payload["images"][0]["url"])
+        self._search_index.add(SEARCH_KIND_SHOW, show_recording.media_group_id, show_recording.title, show_recording)
         return {
             "type": "show",
             "show": show_recording
         }
 
+    def search(self, query: str, kinds=None, limit: int = 10):
+        """Searches channels, recordings, shows and the most recently loaded listings by title.
+        Returns a ranked list of ZiggoSearchResult, kinds restricts the result to the given SEARCH_KIND_* values."""
+        return self._search_index.search(query, kinds, limit)
+
     def play_recording(self, box_id, recording_id):
         self.settop_boxes[box_id].play_recording(recording_id)
 
+    def set_status_settle_window(self, settle_window: float):
+        """Coalesces bursts of status messages per box so only the newest pending status is processed.
+        Statuses are then processed on a worker thread per box that waits settle_window seconds for newer
+        statuses, 0 only skips statuses superseded while the previous one was processed. None, the default,
+        processes every status on the mqtt thread."""
+        self._status_settle_window = settle_window
+        for box in self.settop_boxes.values():
+            box.set_status_settle_window(settle_window)
+
+    def get_status_metrics(self):
+        """Returns the number of received, processed and coalesced status messages over all boxes"""
+        totals = {"received": 0, "processed": 0, "coalesced": 0}
+        for box in self.settop_boxes.values():
+            for key, count in box.get_status_metrics().items():
+                totals[key] += count
+        return totals
+
+    def get_prediction_metrics(self):
+        """Returns the number of optimistic states over all boxes and how many were confirmed or rolled back"""
+        totals = {"predicted": 0, "confirmed": 0, "rolled_back": 0}
+        for box in self.settop_boxes.values():
+            for key, count in box.get_prediction_metrics().items():
+                totals[key] += count
+        totals["accuracy"] = totals["confirmed"] / (totals["confirmed"] + totals["rolled_back"]) if totals["confirmed"] + totals["rolled_back"] else None
+        return totals
+
+    def get_publish_metrics(self):
+        """Returns publisher liveness, queue depth, counts and latency of outbound mqtt messages"""
+        return self.publisher.get_metrics()
+
     def disconnect(self):
+        for box in self.settop_boxes.values():
+            box.stop()
+        self.publisher.stop()
         if not self.mqttClientConnected:
             return
         self.mqttClient.disconnect()
@@ -6,9 +6,12 @@ import json
 import requests
 from logging import Logger
 import random
+import threading
 import time
 import sys, traceback
-from .models import ZiggoNextSession, ZiggoNextBoxPlayingInfo, ZiggoChannel
+from .exceptions import ZiggoNextConnectionError
+from .watchdog import _unmeasured
+from .models import ZiggoNextSession, ZiggoNextBoxPlayingInfo, ZiggoNextBoxSnapshot, ZiggoChannel, ZiggoListing
 from .const import (
     BOX_PLAY_STATE_BUFFER,
     BOX_PLAY_STATE_CHANNEL,
@@ -16,7 +19,10 @@ from .const import (
     BOX_PLAY_STATE_REPLAY,
     BOX_PLAY_STATE_APP,
     BOX_PLAY_STATE_VOD,
-    
+    SEARCH_KIND_LISTING,
+    SEARCH_KIND_RECORDING,
+    PUBLISH_PRIORITY_COMMAND,
+    PUBLISH_PRIORITY_STATUS,
     ONLINE_RUNNING,
     ONLINE_STANDBY,
     UNKNOWN,
@@ -28,6 +34,18 @@ from .const import (
     COUNTRY_URLS_MQTT
 )
 DEFAULT_PORT = 443
+PREDICTION_TIMEOUT = 10
+
+class _Prediction:
+    __slots__ = ("sourceType", "source", "previous", "info", "skipped", "timer")
+
+    def __init__(self, sourceType, source, previous, info):
+        self.sourceType = sourceType
+        self.source = source
+        self.previous = previous
+        self.info = info
+        self.skipped = None
+        self.timer = None
 
 def _makeId(stringLength=10):
     letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
@@ -37,23 +55,47 @@ class ZiggoNextBox:
     
     box_id: str
     name: str
-    state: str = UNKNOWN
-    info: ZiggoNextBoxPlayingInfo
     available: bool = False
     channels: ZiggoChannel = {}
 
-    def __init__(self, box_id:str, name:str, householdId:str, token:str, country_code:str, logger:Logger, mqttClient:Client, client_id:str):
+    def __init__(self, box_id:str, name:str, householdId:str, token:str, country_code:str, logger:Logger, mqttClient:Client, client_id:str, http_get=requests.get, snapshot_listener=None, search_index=None, publisher=None):
         self.box_id = box_id
         self.name = name
         self._householdId = householdId
         self._token = token
-        self.info = ZiggoNextBoxPlayingInfo()
+        self._publish_lock = threading.Lock()
+        self._snapshot_listener = snapshot_listener
+        self._snapshot = ZiggoNextBoxSnapshot(box_id, name, UNKNOWN, ZiggoNextBoxPlayingInfo(), 0)
         self.logger = logger
         self._mqttClientConnected = False
         self._createUrls(country_code)
         self.mqttClientId = client_id
         self.mqttClient = mqttClient
         self._change_callback = None
+        self._http_get = http_get
+        self._search_index = search_index
+        self._publisher = publisher
+        self._watchdog = None
+        self._channel_listings = {}
+        self._recording_listings = {}
+        self._prediction = None
+        self._prediction_lock = threading.Lock()
+        self._prediction_counts = {"predicted": 0, "confirmed": 0, "rolled_back": 0}
+        self._status_settle_window = None
+        self._status_condition = threading.Condition()
+        self._pending_status = None
+        self._status_busy = False
+        self._status_worker = None
+        self._status_generation = 0
+        self._status_counts = {"received": 0, "processed": 0, "coalesced": 0}
+        self._source_type_handlers = {
+            BOX_PLAY_STATE_CHANNEL: self._handle_linear,
+            BOX_PLAY_STATE_REPLAY: self._handle_replay,
+            BOX_PLAY_STATE_DVR: self._handle_dvr,
+            BOX_PLAY_STATE_BUFFER: self._handle_buffer,
+            BOX_PLAY_STATE_VOD: self._handle_vod,
+            BOX_PLAY_STATE_APP: self._handle_app,
+        }
         
     def _createUrls(self, country_code: str):
         baseUrl = COUNTRY_URLS_HTTP[country_code]
@@ -61,6 +103,48 @@ class ZiggoNextBox:
         self._api_url_mediagroup_format =  baseUrl + "/mediagroups/{id}"
         self._mqtt_broker = COUNTRY_URLS_MQTT[country_code]
     
+    @property
+    def state(self) -> str:
+        return self._snapshot.state
+
+    @state.setter
+    def state(self, state: str):
+        self._publish(state=state)
+
+    @property
+    def info(self) -> ZiggoNextBoxPlayingInfo:
+        return self._snapshot.info
+
+    @info.setter
+    def info(self, info: ZiggoNextBoxPlayingInfo):
+        self._publish(info=info)
+
+    def snapshot(self) -> ZiggoNextBoxSnapshot:
+        """Returns a consistent, immutable view of state and info without locking"""
+        return self._snapshot
+
+    def _publish(self, state: str = None, info: ZiggoNextBoxPlayingInfo = None, generation: int = None, replaces: ZiggoNextBoxPlayingInfo = None) -> bool:
+        """Publishes a new snapshot with a single reference swap. Info derived from a status of an older
+        generation than the current one, or meant to replace info that was already replaced, is dropped
+        and False is returned."""
+        with self._publish_lock:
+            if generation is not None and generation != self._status_generation:
+                return False
+            current = self._snapshot
+            if replaces is not None and current.info is not replaces:
+                return False
+            snapshot = ZiggoNextBoxSnapshot(
+                self.box_id,
+                self.name,
+                current.state if state is None else state,
+                current.info if info is None else info.frozen(),
+                current.version + 1,
+            )
+            self._snapshot = snapshot
+            if self._snapshot_listener:
+                self._snapshot_listener(snapshot)
+        return True
+
     def register(self):
         self._do_subscribe("#")
         self._do_subscribe(self._householdId)
@@ -73,11 +157,29 @@ class ZiggoNextBox:
                 "deviceType": "HGO",
             }
         register_topic = self._householdId + "/" + self.mqttClientId + "/status"
-        self.mqttClient.publish(register_topic, json.dumps(payload))
+        self._send(register_topic, json.dumps(payload))
     
+    def _send(self, topic, payload, priority=PUBLISH_PRIORITY_COMMAND):
+        """Publishes a message through the outbound queue when one is configured"""
+        if self._publisher is None:
+            self.mqttClient.publish(topic, payload)
+        else:
+            self._publisher.publish(topic, payload, priority, self.box_id)
+
     def set_callback(self, callback):
         self._change_callback = callback
 
+    def set_watchdog(self, watchdog):
+        """Measures the change callback with the given ZiggoNextWatchdog, None disables it"""
+        self._watchdog = watchdog
+
+    def _notify_change(self):
+        if not self._change_callback:
+            return
+        watchdog = self._watchdog
+        with watchdog.measure("change_callback", self.box_id) if watchdog else _unmeasured():
+            self._change_callback()
+
     def _do_subscribe(self, topic):
         """Subscribes to mqtt topic"""
         self.mqttClient.subscribe(topic)
@@ -92,18 +194,28 @@ class ZiggoNextBox:
         
         if self.state == UNKNOWN:
             self._request_settop_box_state() 
-            self._do_subscribe(self._householdId + "/" + self.mqttClientId)
-            baseTopic = self._householdId + "/" + self.box_id
-            self._do_subscribe(baseTopic)
-            self._do_subscribe(baseTopic + "/status")
+            self._subscribe_box_topics()
         if state == ONLINE_STANDBY :
-            self.info = ZiggoNextBoxPlayingInfo()
+            with self._status_condition:
+                if self._pending_status is not None:
+                    self._pending_status = None
+                    self._status_counts["coalesced"] += 1
+                self._status_generation += 1
+                self._status_condition.notify_all()
+            self._clear_prediction()
+            self._publish(state, ZiggoNextBoxPlayingInfo())
         else:
             self._request_settop_box_state()
-        self.state = state
-        if self._change_callback:
-            self._change_callback()
+            self._publish(state)
+        self._notify_change()
                
+    def _subscribe_box_topics(self):
+        """Subscribes to the topics of this settop box"""
+        self._do_subscribe(self._householdId + "/" + self.mqttClientId)
+        baseTopic = self._householdId + "/" + self.box_id
+        self._do_subscribe(baseTopic)
+        self._do_subscribe(baseTopic + "/status")
+
     def _request_settop_box_state(self):
         """Sends mqtt message to receive state from settop box"""
         self.logger.debug("Request box state for box " + self.name)
@@ -113,110 +225,290 @@ class ZiggoNextBox:
             "type": "CPE.getUiStatus",
             "source": self.mqttClientId,
         }
-        self.mqttClient.publish(topic, json.dumps(payload))
+        self._send(topic, json.dumps(payload), PUBLISH_PRIORITY_STATUS)
     
-    def update_settop_box(self, payload):
-        """Updates settopbox state"""
+    def set_status_settle_window(self, settle_window: float):
+        """Enables coalescing of status messages. Statuses are processed on a worker thread that waits
+        settle_window seconds for newer statuses before processing the newest one. None processes
+        every status directly on the calling thread and stops the worker."""
+        self._status_settle_window = settle_window
+        if settle_window is None:
+            self.stop()
+
+    def submit_status(self, payload):
+        """Queues a status message, replacing a pending one that was not processed yet"""
+        with self._status_condition:
+            self._status_counts["received"] += 1
+            generation = self._status_generation
+            inline = self._status_settle_window is None
+            if not inline:
+                if self._pending_status is not None:
+                    self._status_counts["coalesced"] += 1
+                self._pending_status = (payload, generation)
+                if self._status_worker is None:
+                    self._status_worker = threading.Thread(target=self._run_status_worker, name="ziggonext-status-" + self.box_id, daemon=True)
+                    self._status_worker.start()
+                self._status_condition.notify_all()
+        if inline:
+            self._process_status(payload, generation)
+
+    def _run_status_worker(self):
+        worker = threading.current_thread()
+        while True:
+            with self._status_condition:
+                while self._pending_status is None and self._status_worker is worker:
+                    self._status_busy = False
+                    self._status_condition.notify_all()
+                    self._status_condition.wait()
+                settle_window = self._status_settle_window
+                if settle_window and self._status_worker is worker:
+                    self._status_busy = True
+                    self._status_condition.wait_for(lambda: self._status_worker is not worker, settle_window)
+                if self._status_worker is not worker:
+                    if self._status_worker is None:
+                        self._status_busy = False
+                    self._status_condition.notify_all()
+                    return
+                self._status_busy = True
+                pending = self._pending_status
+                self._pending_status = None
+            if pending is None:
+                continue
+            try:
+                self._process_status(*pending)
+            except Exception:
+                self.logger.exception("Processing status for box %s failed", self.box_id)
+
+    def stop(self):
+        """Stops the status worker thread, dropping a pending status and optimistic state"""
+        self._clear_prediction()
+        with self._status_condition:
+            worker = self._status_worker
+            self._status_worker = None
+            self._pending_status = None
+            self._status_condition.notify_all()
+        if worker is not None and worker is not threading.current_thread():
+            worker.join()
+
+    def _process_status(self, payload, generation=None):
+        watchdog = self._watchdog
+        with watchdog.measure("update_settop_box", self.box_id, payload.get("type")) if watchdog else _unmeasured():
+            self.update_settop_box(payload, generation)
+        with self._status_condition:
+            self._status_counts["processed"] += 1
+
+    def wait_for_status(self, timeout: float = None) -> bool:
+        """Blocks until all submitted statuses are processed, returns False on timeout"""
+        with self._status_condition:
+            return self._status_condition.wait_for(lambda: self._pending_status is None and not self._status_busy, timeout)
+
+    def get_status_metrics(self):
+        """Returns the number of received, processed and coalesced status messages"""
+        with self._status_condition:
+            return dict(self._status_counts)
+
+    def update_settop_box(self, payload, generation: int = None):
+        """Updates settopbox state. The update is dropped when a standby arrived after the status
+        of the given generation was received."""
+        self._update_settop_box(payload, generation)
+
+    def _update_settop_box(self, payload, generation: int = None, replaces: ZiggoNextBoxPlayingInfo = None):
         deviceId = payload["source"]
         if deviceId != self.box_id:
             return
-        self.logger.debug(f"Updating box {self.box_id} with payload:")
-        self.logger.debug(payload)
+        self.logger.debug("Updating box %s with payload: %s", self.box_id, payload)
         statusPayload = payload["status"]
         if not "uiStatus" in statusPayload:
-            self.logger.debug("Unexpected statusPayload: ")
-            self.logger.debug(statusPayload)
+            self.logger.debug("Unexpected statusPayload: %s", statusPayload)
             return
         uiStatus = statusPayload["uiStatus"]
         if uiStatus == "mainUI":
-            playerState = statusPayload["playerState"]
-            sourceType = playerState["sourceType"]
-            stateSource = playerState["source"]
-            speed = playerState["speed"]
-            if self.info is None:
-                self.info = ZiggoNextBoxPlayingInfo()
-            if sourceType == BOX_PLAY_STATE_REPLAY:
-                self.info.setSourceType(BOX_PLAY_STATE_REPLAY)
-                eventId = stateSource["eventId"]
-                listing = self._get_listing(eventId)
-                channel_id = self._get_listing_channel_id(listing)
-                channel = self.channels[channel_id]
-                self.info.setChannel(channel_id)
-                self.info.setChannelTitle(channel.title)
-                self.info.setTitle(
-                    "ReplayTV: " + self._get_listing_title(listing)
-                )
-                self.info.setImage(self._get_listing_image(listing))
-                self.info.setPaused(speed == 0)
-            elif sourceType == BOX_PLAY_STATE_DVR:
-                self.info.setSourceType(BOX_PLAY_STATE_DVR)
-                recordingId = stateSource["recordingId"]
-                listing = self._get_listing(recordingId)
-                self.logger.info(self.channels)
-                channel_id = self._get_listing_channel_id(listing)
-                self.logger.info(self.channels)
-                channel = self.channels[channel_id]
-                self.info.setChannel(channel_id)
-                self.info.setChannelTitle(channel.title)
-                self.info.setTitle("Recording: " + self._get_listing_title(listing))
-                self.info.setImage(
-                    self._get_listing_image(listing)
-                )
-                self.info.setPaused(speed == 0)
-            elif sourceType == BOX_PLAY_STATE_BUFFER:
-                self.info.setSourceType(BOX_PLAY_STATE_BUFFER)
-                channelId = stateSource["channelId"]
-                channel = self.channels[channelId]
-                eventId = stateSource["eventId"]
-                listing = self._get_listing(eventId)
-                self.info.setChannel(channelId)
-                self.info.setChannelTitle(channel.title)
-                self.info.setTitle(
-                    "Delayed: " + self._get_listing_title(listing)
-                )
-                self.info.setImage(channel.streamImage)
-                self.info.setPaused(speed == 0)
-            elif playerState["sourceType"] == BOX_PLAY_STATE_CHANNEL:
-                self.info.setSourceType(BOX_PLAY_STATE_CHANNEL)
-                channelId = stateSource["channelId"]
-                eventId = stateSource["eventId"]
-                channel = self.channels[channelId]
-                listing = self._get_listing(eventId)
-                self.info.setChannel(channelId)
-                self.info.setChannelTitle(channel.title)
-                self.info.setTitle(self._get_listing_title(listing))
-                self.info.setImage(channel.streamImage)
-                self.info.setPaused(False)
-            elif playerState["sourceType"] == BOX_PLAY_STATE_VOD:
-                self.info.setSourceType(BOX_PLAY_STATE_VOD)
-                title_id = stateSource["titleId"]
-                mediagroup_content = self._get_mediagroup(title_id)
-                self.info.setChannel(None)
-                self.info.setChannelTitle("VOD")
-                self.info.setTitle(mediagroup_content["title"])
-                self.info.setImage(self._get_mediagroup_image(mediagroup_content))
-                self.info.setPaused(speed == 0)
-            else:
-                self.info.setSourceType(BOX_PLAY_STATE_CHANNEL)
-                eventId = stateSource["eventId"]
-                self.info.setChannel(None)
-                self.info.setTitle("Playing something...")
-                self.info.setImage(None)
-                self.info.setPaused(speed == 0)
+            sourceType = statusPayload["playerState"]["sourceType"]
         elif uiStatus == "apps":
-            appsState = statusPayload["appsState"]
-            logoPath = appsState["logoPath"]
-            if not logoPath.startswith("http:"):
-                logoPath = "https:" + logoPath
-            self.info.setSourceType(BOX_PLAY_STATE_APP)
-            self.info.setChannel(None)
-            self.info.setChannelTitle(appsState["appName"])
-            self.info.setTitle(appsState["appName"])
-            self.info.setImage(logoPath)
-            self.info.setPaused(False)
-    
-        if self._change_callback:
-            self._change_callback()
+            sourceType = BOX_PLAY_STATE_APP
+        else:
+            sourceType = None
+        if sourceType is not None:
+            with self._prediction_lock:
+                prediction = self._prediction
+                if prediction is not None:
+                    if not self._prediction_matches(prediction, sourceType, statusPayload):
+                        # a reply to an earlier request, keep the optimistic state until the deadline
+                        prediction.skipped = (payload, generation)
+                        return
+                    self._prediction = None
+                    prediction.timer.cancel()
+                    self._prediction_counts["confirmed"] += 1
+            handler = self._source_type_handlers.get(sourceType, self._handle_unknown_source)
+            info = handler(statusPayload)
+            if "playerState" in statusPayload:
+                playerState = statusPayload["playerState"]
+                position = playerState.get("relativePosition")
+                if sourceType == BOX_PLAY_STATE_CHANNEL:
+                    position = None
+                info.setPlayback(position, playerState["speed"], time.time())
+            if not self._publish(info=info, generation=generation, replaces=replaces):
+                self.logger.debug("Dropped status for box %s superseded by a newer one", self.box_id)
+                return
+
+        self._notify_change()
+
+    def _prediction_matches(self, prediction: _Prediction, sourceType, statusPayload):
+        """Returns whether the box reports the optimistic state"""
+        actualSource = None
+        if sourceType == BOX_PLAY_STATE_CHANNEL:
+            actualSource = statusPayload["playerState"]["source"].get("channelId")
+        elif sourceType == BOX_PLAY_STATE_DVR:
+            actualSource = statusPayload["playerState"]["source"].get("recordingId")
+        return prediction.sourceType == sourceType and prediction.source == actualSource
+
+    def _apply_prediction(self, sourceType, source, info: ZiggoNextBoxPlayingInfo):
+        """Publishes provisional info until the box reports the same state or PREDICTION_TIMEOUT passes"""
+        info.setPlayback(0 if sourceType != BOX_PLAY_STATE_CHANNEL else None, 1, time.time())
+        with self._prediction_lock:
+            previous = self.info
+            if self._prediction is not None:
+                self._prediction.timer.cancel()
+                previous = self._prediction.previous
+            prediction = _Prediction(sourceType, source, previous, info.frozen())
+            prediction.timer = threading.Timer(PREDICTION_TIMEOUT, self._expire_prediction, (prediction,))
+            prediction.timer.daemon = True
+            self._prediction = prediction
+            self._prediction_counts["predicted"] += 1
+            self._publish(info=prediction.info)
+        prediction.timer.start()
+        self._notify_change()
+
+    def _expire_prediction(self, prediction: _Prediction):
+        """Rolls back an optimistic state the box did not confirm in time. Runs on the timer thread,
+        so the rollback only replaces the optimistic info: a status or standby published meanwhile wins."""
+        with self._prediction_lock:
+            if self._prediction is not prediction:
+                return
+            self._prediction = None
+            self._prediction_counts["rolled_back"] += 1
+        self.logger.debug("Optimistic state for box %s not confirmed, rolling back", self.box_id)
+        if prediction.skipped is not None:
+            self._update_settop_box(*prediction.skipped, replaces=prediction.info)
+            return
+        if not self._publish(info=prediction.previous, replaces=prediction.info):
+            return
+        self._notify_change()
+        self._request_settop_box_state()
+
+    def _clear_prediction(self):
+        with self._prediction_lock:
+            prediction = self._prediction
+            self._prediction = None
+        if prediction is not None:
+            prediction.timer.cancel()
+
+    def get_prediction_metrics(self):
+        """Returns the number of optimistic states and how many were confirmed or rolled back"""
+        with self._prediction_lock:
+            return dict(self._prediction_counts)
+
+    def set_source_type_handler(self, sourceType: str, handler):
+        """Registers handler(statusPayload) -> ZiggoNextBoxPlayingInfo for the given sourceType"""
+        self._source_type_handlers[sourceType] = handler
+
+    def _handle_linear(self, statusPayload):
+        stateSource = statusPayload["playerState"]["source"]
+        channelId = stateSource["channelId"]
+        channel = self.channels[channelId]
+        listing = self._get_listing(stateSource["eventId"])
+        if listing is not None:
+            self._channel_listings[channelId] = listing
+        return ZiggoNextBoxPlayingInfo(
+            BOX_PLAY_STATE_CHANNEL,
+            channelId,
+            channel.title,
+            self._get_listing_title(listing),
+            channel.streamImage,
+            False,
+            *self._get_listing_times(listing),
+        )
+
+    def _handle_replay(self, statusPayload):
+        playerState = statusPayload["playerState"]
+        stateSource = playerState["source"]
+        listing = self._get_listing(stateSource["eventId"])
+        channelId = self._get_listing_channel_id(listing) or stateSource.get("channelId")
+        return ZiggoNextBoxPlayingInfo(
+            BOX_PLAY_STATE_REPLAY,
+            channelId,
+            self._get_channel_title(channelId),
+            "ReplayTV: " + self._get_listing_title(listing),
+            self._get_listing_image(listing),
+            playerState["speed"] == 0,
+            *self._get_listing_times(listing),
+        )
+
+    def _handle_dvr(self, statusPayload):
+        playerState = statusPayload["playerState"]
+        recordingId = playerState["source"]["recordingId"]
+        listing = self._get_listing(recordingId)
+        if listing is not None:
+            self._recording_listings[recordingId] = listing
+        channelId = self._get_listing_channel_id(listing) or playerState["source"].get("channelId")
+        return ZiggoNextBoxPlayingInfo(
+            BOX_PLAY_STATE_DVR,
+            channelId,
+            self._get_channel_title(channelId),
+            "Recording: " + self._get_listing_title(listing),
+            self._get_listing_image(listing),
+            playerState["speed"] == 0,
+            *self._get_listing_times(listing),
+        )
+
+    def _handle_buffer(self, statusPayload):
+        playerState = statusPayload["playerState"]
+        stateSource = playerState["source"]
+        channelId = stateSource["channelId"]
+        channel = self.channels[channelId]
+        listing = self._get_listing(stateSource["eventId"])
+        return ZiggoNextBoxPlayingInfo(
+            BOX_PLAY_STATE_BUFFER,
+            channelId,
+            channel.title,
+            "Delayed: " + self._get_listing_title(listing),
+            channel.streamImage,
+            playerState["speed"] == 0,
+            *self._get_listing_times(listing),
+        )
+
+    def _handle_vod(self, statusPayload):
+        playerState = statusPayload["playerState"]
+        mediagroup_content = self._get_mediagroup(playerState["source"]["titleId"])
+        return ZiggoNextBoxPlayingInfo(
+            BOX_PLAY_STATE_VOD,
+            None,
+            "VOD",
+            mediagroup_content["title"] if mediagroup_content is not None else "",
+            self._get_mediagroup_image(mediagroup_content),
+            playerState["speed"] == 0,
+        )
+
+    def _handle_app(self, statusPayload):
+        appsState = statusPayload["appsState"]
+        logoPath = appsState["logoPath"]
+        if not logoPath.startswith("http:"):
+            logoPath = "https:" + logoPath
+        return ZiggoNextBoxPlayingInfo(
+            BOX_PLAY_STATE_APP,
+            None,
+            appsState["appName"],
+            appsState["appName"],
+            logoPath,
+            False,
+        )
+
+    def _handle_unknown_source(self, statusPayload):
+        return ZiggoNextBoxPlayingInfo(
+            BOX_PLAY_STATE_CHANNEL,
+            title="Playing something...",
+            paused=statusPayload["playerState"]["speed"] == 0,
+        )
     
     def _get_listing_title(self, listing_content):
         """Get listing title."""
@@ -225,28 +517,72 @@ class ZiggoNextBox:
         return listing_content["program"]["title"]
 
     
+    def _get_listing_times(self, listing_content):
+        """Get listing start and end time (epoch ms)."""
+        if listing_content is None:
+            return None, None
+        return listing_content.get("startTime"), listing_content.get("endTime")
+
     def _get_listing_image(self, listing_content):
         """Get listing image."""
+        if listing_content is None:
+            return None
         return listing_content["program"]["images"][0]["url"]
 
     def _get_listing_channel_id(self, listing_content):
         """Get listing channelId."""
+        if listing_content is None:
+            return None
         return listing_content["stationId"].replace("lgi-nl-prod-master:","").replace("lgi-be-prod-master:","")
     
     def _get_listing(self, listing_id):
-        response = requests.get(self._api_url_listing_format.format(id=listing_id))
+        try:
+            response = self._http_get(self._api_url_listing_format.format(id=listing_id))
+        except ZiggoNextConnectionError as exception:
+            self.logger.warning("Could not get listing %s: %s", listing_id, exception)
+            return None
         if response.status_code == 200:
-            return response.json()
+            listing = response.json()
+            if self._search_index is not None and "program" in listing:
+                self._index_listing(listing_id, listing)
+            return listing
         return None
 
+    def _index_listing(self, listing_id, listing):
+        """Adds the fields of a listing needed by search results to the search index"""
+        program = listing["program"]
+        images = program.get("images")
+        self._search_index.add(
+            SEARCH_KIND_LISTING,
+            listing_id,
+            program.get("title"),
+            ZiggoListing(
+                listing_id,
+                program.get("title"),
+                self._get_listing_channel_id(listing) if "stationId" in listing else None,
+                images[0]["url"] if images else None,
+                *self._get_listing_times(listing),
+            ),
+        )
+
     def _get_mediagroup(self, title_id):
-        response = requests.get(self._api_url_mediagroup_format.format(id=title_id))
+        try:
+            response = self._http_get(self._api_url_mediagroup_format.format(id=title_id))
+        except ZiggoNextConnectionError as exception:
+            self.logger.warning("Could not get mediagroup %s: %s", title_id, exception)
+            return None
         if response.status_code == 200:
             return response.json()
         return None
     
     def _get_mediagroup_image(self, mediagroup_content):
+        if mediagroup_content is None:
+            return None
         return mediagroup_content["images"][0]["url"]
+
+    def _get_channel_title(self, channelId):
+        channel = self.channels.get(channelId)
+        return channel.title if channel is not None else None
     
     def send_key_to_box(self,key: str):
         """Sends emulated (remote) key press to settopbox"""
@@ -255,7 +591,7 @@ class ZiggoNextBox:
             + key
             + '","eventType":"keyDownUp"}}'
         )
-        self.mqttClient.publish(self._householdId+ "/" + self.box_id, payload)
+        self._send(self._householdId + "/" + self.box_id, payload)
         self._request_settop_box_state()
     
     def set_channel(self, serviceId):
@@ -269,8 +605,27 @@ class ZiggoNextBox:
             + '"},"relativePosition":0,"speed":1}}'
         )
 
-        self.mqttClient.publish(self._householdId + "/" + self.box_id, payload)
+        self._send(self._householdId + "/" + self.box_id, payload)
         self._request_settop_box_state()
+        if serviceId in self.channels:
+            channel = self.channels[serviceId]
+            listing = self._channel_listings.get(serviceId)
+            if listing is not None and (listing.get("endTime") or 0) < time.time() * 1000:
+                listing = None
+            self._apply_prediction(
+                BOX_PLAY_STATE_CHANNEL,
+                serviceId,
+                ZiggoNextBoxPlayingInfo(
+                    BOX_PLAY_STATE_CHANNEL,
+                    serviceId,
+                    channel.title,
+                    self._get_listing_title(listing),
+                    channel.streamImage,
+                    False,
+                    *self._get_listing_times(listing),
+                    provisional=True,
+                ),
+            )
 
     def play_recording(self, recordingId):
         payload = (
@@ -283,8 +638,33 @@ class ZiggoNextBox:
             + '"},"relativePosition":0}}'
         )
 
-        self.mqttClient.publish(self._householdId + "/" + self.box_id, payload)
+        self._send(self._householdId + "/" + self.box_id, payload)
         self._request_settop_box_state()
+        listing = self._recording_listings.get(recordingId)
+        if listing is not None:
+            channelId = self._get_listing_channel_id(listing)
+            info = ZiggoNextBoxPlayingInfo(
+                BOX_PLAY_STATE_DVR,
+                channelId,
+                self._get_channel_title(channelId),
+                "Recording: " + self._get_listing_title(listing),
+                self._get_listing_image(listing),
+                False,
+                *self._get_listing_times(listing),
+                provisional=True,
+            )
+        else:
+            recording = self._search_index.get(SEARCH_KIND_RECORDING, recordingId) if self._search_index is not None else None
+            if recording is None:
+                return
+            info = ZiggoNextBoxPlayingInfo(
+                BOX_PLAY_STATE_DVR,
+                title="Recording: " + recording.title,
+                image=recording.image,
+                provisional=True,
+            )
+        self._apply_prediction(BOX_PLAY_STATE_DVR, recordingId, info)
     
     def turn_off(self):
+        self._clear_prediction()
         self.info = ZiggoNextBoxPlayingInfo()
\ No newline at end of file